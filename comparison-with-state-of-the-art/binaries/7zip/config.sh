@@ -27,7 +27,7 @@ function build_ft {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign --jobs=auto -b
+    dpkg-buildpackage --no-sign --jobs=${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -50,7 +50,7 @@ function build_afl {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign --jobs=auto -b
+    dpkg-buildpackage --no-sign --jobs=${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -76,7 +76,7 @@ function build_symcc {
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
     # fails because of dpkg-shlibdeps missing deps for custom std++
-    dpkg-buildpackage --no-sign --jobs=auto -b || true
+    dpkg-buildpackage --no-sign --jobs=${FT_BUILD_JOBS:-auto} -b || true
     popd > /dev/null
 }
 
@@ -101,7 +101,7 @@ function build_afl_symcc {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign --jobs=auto -b
+    dpkg-buildpackage --no-sign --jobs=${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -119,7 +119,7 @@ function build_vanilla {
     export DEB_CXXFLAGS_SET="-g"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    bear dpkg-buildpackage --no-sign --jobs=auto -b
+    bear dpkg-buildpackage --no-sign --jobs=${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
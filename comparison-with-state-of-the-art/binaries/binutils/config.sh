@@ -30,7 +30,7 @@ function build_ft {
     sed -i "s@.*--with-system-zlib.*@\\\@g" debian/rules
     sed -i "s@.*--enable-threads.*@\\\@g" debian/rules
 
-    dpkg-buildpackage --no-sign -jauto -b || true
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b || true
     popd > /dev/null
 }
 
@@ -60,7 +60,7 @@ function build_afl {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     sed -i "s@^LDFLAGS.*@CFLAGS=$DEB_LDFLAGS_SET@g" debian/rules
 
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -92,7 +92,7 @@ function build_afl_symcc {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     sed -i "s@^LDFLAGS.*@CFLAGS=$DEB_LDFLAGS_SET@g" debian/rules
 
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -122,7 +122,7 @@ function build_symcc {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     sed -i "s@^LDFLAGS.*@CFLAGS=$DEB_LDFLAGS_SET@g" debian/rules
 
-    dpkg-buildpackage --no-sign -jauto -b || true
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b || true
     popd > /dev/null
 }
 
@@ -143,7 +143,7 @@ function build_vanilla {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     sed -i "s@^LDFLAGS.*@CFLAGS=$DEB_LDFLAGS_SET@g" debian/rules
 
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -3,17 +3,6 @@
 set -eu
 set -o pipefail
 
-cmds=""
-for dir in $PWD/*; do
-    if [[ -d $dir ]]; then
-        cmds+="./build.sh $(basename $dir) $1\n"
-    fi
-done
-
-no_parallel=""
-if [[ "$1" == "deps" ]]; then
-    # deps stage uses apt, which does not allow parallel execution.
-    no_parallel="-j1"
-fi
-
-echo -e $cmds |  parallel $no_parallel --bar -k
\ No newline at end of file
+# The stages of all targets are scheduled by build_all.py, which builds them in
+# parallel within a global budget of cores (see ./build_all.py --help).
+exec "$(dirname "$0")/build_all.py" "$@"
@@ -39,6 +39,14 @@ if [[ ! -f "$cfg_path" ]]; then
     exit 1
 fi
 
+# Parallelism of the make calls in config.sh. If build_all.py passes a jobserver via
+# MAKEFLAGS, make must not be given -j, since it would ignore the jobserver otherwise.
+if [[ "${MAKEFLAGS-}" == *--jobserver-auth=* ]]; then
+    MAKE_JOBS=""
+else
+    MAKE_JOBS="-j${FT_BUILD_JOBS:-}"
+fi
+
 cd $path
 source config.sh
 check_config_exported_functions
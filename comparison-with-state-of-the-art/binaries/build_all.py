@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Build all targets in parallel while respecting the dependencies between the build stages
+and a global budget of CPU cores.
+
+The stages of each target form a small DAG:
+    src -> deps -> {ft, afl, symcc, vanilla}
+Stages of different targets are independent, except for `deps`, which installs packages
+via apt that other builds may link against and thus never runs concurrently with any
+other stage.
+
+The budget is a GNU make jobserver, i.e., a pipe holding one token per core. Stages whose
+config.sh only builds via `make $MAKE_JOBS` hold a single token and get the jobserver
+passed via MAKEFLAGS. Their make processes take further tokens whenever they have jobs to
+run and return them afterwards, thus running builds pick up the cores freed by finished
+ones (e.g., the long AFL++ builds at the end use all cores). The remaining stages (e.g.,
+dpkg-buildpackage, whose debhelper forces its own -jN) cannot change their number of jobs
+once started. Therefore, only one of them runs at a time, it takes all tokens that are free
+when it starts, and passes their number as FT_BUILD_JOBS to config.sh. Stages using the
+jobserver run alongside it.
+
+Usage:
+    ./build_all.py [mode] [--jobs N]
+The modes are the same as for build.sh. If a single mode is given, only this stage is
+run for each target, assuming the stages it depends on are already done.
+"""
+
+import argparse
+import array
+import fcntl
+import json
+import os
+import re
+import sys
+import termios
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from build_cache import (ALL_MODES, BINARIES_DIR, DEFAULT_CACHE_DIR, MODE_TO_FUNCTIONS,
+                         BuildCache, function_bodies)
+
+# Stages each stage depends on.
+STAGE_DEPENDENCIES: Dict[str, List[str]] = {
+    'src': [],
+    'deps': ['src'],
+    'ft': ['deps'],
+    'afl': ['deps'],
+    'symcc': ['deps'],
+    'vanilla': ['deps'],
+}
+# Stages that must not run concurrently with any other stage.
+EXCLUSIVE_STAGES = {'deps'}
+# Stages that mostly wait for the network or apt and are thus granted a single job token.
+LIGHT_STAGES = {'src', 'deps'}
+# Ready stages with lower values are started first. `src` and `deps` unblock all other
+# stages of a target. The AFL++ builds take several hours for some targets because of
+# the collision-free encoding, thus they are started before the remaining builds.
+STAGE_PRIORITY = {'src': 0, 'deps': 0, 'afl': 1, 'symcc': 2, 'ft': 3, 'vanilla': 4}
+
+# Durations of previous builds, used to start the longest builds of each priority class first.
+TIMINGS_FILE = 'build-times.json'
+DEFAULT_LOG_DIR = BINARIES_DIR / 'build-logs'
+# Tokens returned by make processes do not wake up the scheduler, thus it checks for
+# free tokens (and samples the utilization) in this interval.
+POLL_INTERVAL_S = 1.0
+
+
+class Jobserver:
+    """
+    Pipe holding the free job tokens, compatible with the jobserver of GNU make (>= 4.2).
+    """
+
+    def __init__(self, tokens: int):
+        self._read_fd, self._write_fd = os.pipe()
+        # GNU make reads from the pipe in non-blocking mode as well.
+        os.set_blocking(self._read_fd, False)
+        os.write(self._write_fd, b'+' * tokens)
+
+    def fds(self):
+        return (self._read_fd, self._write_fd)
+
+    def makeflags(self, tokens: int) -> str:
+        return f'-j{tokens} --jobserver-auth={self._read_fd},{self._write_fd}'
+
+    def available(self) -> int:
+        buf = array.array('i', [0])
+        fcntl.ioctl(self._read_fd, termios.FIONREAD, buf)
+        return buf[0]
+
+    def acquire(self, tokens: int, minimum: int) -> int:
+        """
+        Take up to `tokens` tokens. Returns the number taken, which is 0 if less than `minimum` are free.
+        """
+        try:
+            taken = len(os.read(self._read_fd, tokens))
+        except BlockingIOError:
+            taken = 0
+        if taken < minimum:
+            self.release(taken)
+            return 0
+        return taken
+
+    def release(self, tokens: int):
+        if tokens > 0:
+            os.write(self._write_fd, b'+' * tokens)
+
+
+class StageState:
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+
+
+@dataclass(eq=False)
+class Stage:
+    target_dir: Path
+    mode: str
+    dependencies: List['Stage'] = field(default_factory=list)
+    # Whether the stage builds via make only and thus can use the shared jobserver.
+    uses_jobserver: bool = False
+    state: str = StageState.PENDING
+    # How the stage finished, as returned by BuildCache.build.
+    result: Optional[str] = None
+    jobs: int = 0
+    start_ts: float = 0.0
+    duration_s: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return f'{self.target_dir.name}/{self.mode}'
+
+    def is_ready(self) -> bool:
+        return self.state == StageState.PENDING and all(d.state == StageState.DONE for d in self.dependencies)
+
+    def is_blocked(self) -> bool:
+        return any(d.state in (StageState.FAILED, StageState.SKIPPED) for d in self.dependencies)
+
+    def jobs_str(self) -> str:
+        return 'js' if self.uses_jobserver else str(self.jobs)
+
+
+def discover_targets() -> List[Path]:
+    return sorted(p.parent for p in BINARIES_DIR.glob('*/config.sh'))
+
+
+def uses_jobserver(target_dir: Path, mode: str) -> bool:
+    """
+    Whether the config.sh functions of `mode` only use make with $MAKE_JOBS, which is
+    empty if a jobserver is passed.
+    """
+    if mode in LIGHT_STAGES or mode not in MODE_TO_FUNCTIONS:
+        return False
+    bodies = function_bodies(target_dir, MODE_TO_FUNCTIONS[mode])
+    return re.search(r'\$\{?MAKE_JOBS\b', bodies) is not None and 'FT_BUILD_JOBS' not in bodies
+
+
+def create_stages(targets: List[Path], mode: str) -> List[Stage]:
+    stages = []
+    for target_dir in targets:
+        if mode != 'all':
+            stages.append(Stage(target_dir, mode, uses_jobserver=uses_jobserver(target_dir, mode)))
+            continue
+        by_mode: Dict[str, Stage] = {}
+        for m in ALL_MODES:
+            stage = Stage(target_dir, m, [by_mode[d] for d in STAGE_DEPENDENCIES[m]],
+                          uses_jobserver(target_dir, m))
+            by_mode[m] = stage
+            stages.append(stage)
+    return stages
+
+
+class BuildScheduler:
+    """
+    Runs the stages as soon as their dependencies are done and enough job tokens are available.
+    """
+
+    def __init__(self, stages: List[Stage], cache: BuildCache, jobs: int, jobs_per_build: int,
+                 log_dir: Path, timings: Dict[str, float], force: bool = False):
+        self._stages = stages
+        self._cache = cache
+        self._jobs = jobs
+        self._jobs_per_build = min(jobs_per_build, jobs)
+        self._log_dir = log_dir
+        self._timings = timings
+        self._force = force
+        self._jobserver = Jobserver(jobs)
+        # Sum and number of samples of the tokens in use, for the utilization report.
+        self._busy_tokens = 0
+        self._samples = 0
+        self._cv = threading.Condition()
+
+    def _order_key(self, stage: Stage):
+        return (STAGE_PRIORITY[stage.mode], -self._timings.get(stage.name, 0.0), stage.name)
+
+    @staticmethod
+    def _has_fixed_jobs(stage: Stage) -> bool:
+        return stage.mode not in LIGHT_STAGES and not stage.uses_jobserver
+
+    def _acquire_tokens(self, stage: Stage) -> int:
+        """
+        Take the tokens `stage` is started with, or 0 if it has to wait for running stages to finish.
+        """
+        if not BuildScheduler._has_fixed_jobs(stage):
+            # Stages using the jobserver take further tokens while running.
+            return self._jobserver.acquire(1, 1)
+        return self._jobserver.acquire(self._jobs, self._jobs_per_build)
+
+    def _run_stage(self, stage: Stage):
+        log_path = self._log_dir / stage.target_dir.name / f'{stage.mode}.log'
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        env = dict(os.environ)
+        pass_fds = ()
+        if stage.uses_jobserver:
+            env['MAKEFLAGS'] = self._jobserver.makeflags(self._jobs)
+            pass_fds = self._jobserver.fds()
+        else:
+            env['FT_BUILD_JOBS'] = str(stage.jobs)
+        try:
+            with log_path.open('w') as log:
+                stage.result = self._cache.build(stage.target_dir, stage.mode, env=env, force=self._force,
+                                                 stdout=log, pass_fds=pass_fds)
+            state = StageState.DONE
+        except Exception as e:
+            print(f'[!] {stage.name} failed: {e} (see {log_path})', flush=True)
+            state = StageState.FAILED
+
+        with self._cv:
+            stage.duration_s = time.monotonic() - stage.start_ts
+            stage.state = state
+            self._jobserver.release(stage.jobs)
+            if state == StageState.DONE:
+                print(f'[+] {stage.name} {stage.result} ({stage.duration_s:.0f}s, {stage.jobs_str()} jobs)', flush=True)
+            self._cv.notify()
+
+    def _skip_blocked(self):
+        changed = True
+        while changed:
+            changed = False
+            for stage in self._stages:
+                if stage.state == StageState.PENDING and stage.is_blocked():
+                    print(f'[!] {stage.name} skipped, since a stage it depends on failed', flush=True)
+                    stage.state = StageState.SKIPPED
+                    changed = True
+
+    def _start_ready_stages(self):
+        self._skip_blocked()
+        running = [s for s in self._stages if s.state == StageState.RUNNING]
+        if any(s.mode in EXCLUSIVE_STAGES for s in running):
+            return
+        fixed_jobs_running = any(BuildScheduler._has_fixed_jobs(s) for s in running)
+        ready = sorted((s for s in self._stages if s.is_ready()), key=self._order_key)
+        for stage in ready:
+            if stage.mode in EXCLUSIVE_STAGES:
+                # Wait for the running stages to finish without starting further ones.
+                tokens = self._acquire_tokens(stage) if not running else 0
+                if tokens > 0:
+                    self._start_stage(stage, tokens)
+                return
+            if BuildScheduler._has_fixed_jobs(stage) and fixed_jobs_running:
+                continue
+            tokens = self._acquire_tokens(stage)
+            if tokens == 0:
+                # Do not let lower priority stages overtake a stage that waits for tokens.
+                if stage.mode not in LIGHT_STAGES:
+                    break
+                continue
+            self._start_stage(stage, tokens)
+            running.append(stage)
+            fixed_jobs_running = fixed_jobs_running or BuildScheduler._has_fixed_jobs(stage)
+
+    def _start_stage(self, stage: Stage, tokens: int):
+        stage.jobs = tokens
+        stage.state = StageState.RUNNING
+        stage.start_ts = time.monotonic()
+        print(f'[*] {stage.name} started ({stage.jobs_str()} jobs)', flush=True)
+        threading.Thread(target=self._run_stage, args=(stage,), name=stage.name, daemon=True).start()
+
+    def run(self) -> bool:
+        """
+        Run all stages. Returns whether all of them succeeded.
+        """
+        with self._cv:
+            while True:
+                self._start_ready_stages()
+                if all(s.state not in (StageState.PENDING, StageState.RUNNING) for s in self._stages):
+                    break
+                self._cv.wait(POLL_INTERVAL_S)
+                self._busy_tokens += self._jobs - self._jobserver.available()
+                self._samples += 1
+        return all(s.state == StageState.DONE for s in self._stages)
+
+    def report(self, wall_time_s: float):
+        print(f'\n{"stage":<28} {"result":<12} {"jobs":>4} {"duration":>10}')
+        for stage in sorted(self._stages, key=lambda s: -s.duration_s):
+            result = stage.result if stage.state == StageState.DONE else stage.state
+            print(f'{stage.name:<28} {result:<12} {stage.jobs_str():>4} {stage.duration_s:>9.0f}s')
+        utilization = self._busy_tokens / (self._samples * self._jobs) if self._samples else 0.0
+        print(f'\nTotal: {wall_time_s:.0f}s wall time, {utilization:.0%} of the {self._jobs} job tokens in use on average')
+        print('Stages with "js" jobs used the shared jobserver.')
+
+    def timings(self) -> Dict[str, float]:
+        # Restored or up-to-date stages say nothing about how long a build takes.
+        timings = dict(self._timings)
+        for stage in self._stages:
+            if stage.state == StageState.DONE and stage.result == 'built':
+                timings[stage.name] = round(stage.duration_s, 1)
+        return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build all targets in parallel within a global CPU budget.')
+    parser.add_argument('mode', nargs='?', default='all', help='Mode passed to build.sh (default: all).')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Total number of job tokens (default: number of cores).')
+    parser.add_argument('--jobs-per-build', type=int, default=None, help='Minimal number of free tokens a compiling stage without jobserver support waits for (default: jobs/8, at least 2).')
+    parser.add_argument('--targets', nargs='+', help='Only build the given targets.')
+    parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR, help=f'Build cache location (default: {DEFAULT_CACHE_DIR}).')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if cached artifacts are available.')
+    parser.add_argument('--log-dir', type=Path, default=DEFAULT_LOG_DIR, help=f'Where to store the output of each stage (default: {DEFAULT_LOG_DIR}).')
+    args = parser.parse_args()
+
+    if args.mode != 'all' and args.mode not in ALL_MODES:
+        parser.error(f'Invalid mode {args.mode}')
+    if args.jobs < 1:
+        parser.error('--jobs must be >= 1')
+    jobs_per_build = args.jobs_per_build or max(2, args.jobs // 8)
+
+    targets = discover_targets()
+    if args.targets:
+        unknown = set(args.targets) - {t.name for t in targets}
+        if unknown:
+            parser.error(f'Unknown targets: {", ".join(sorted(unknown))}')
+        targets = [t for t in targets if t.name in args.targets]
+
+    timings_path = args.cache_dir / TIMINGS_FILE
+    timings = json.loads(timings_path.read_text()) if timings_path.is_file() else {}
+
+    cache = BuildCache(args.cache_dir, args.jobs)
+    stages = create_stages(targets, args.mode)
+    scheduler = BuildScheduler(stages, cache, args.jobs, jobs_per_build, args.log_dir, timings, args.force)
+    start_ts = time.monotonic()
+    try:
+        succeeded = scheduler.run()
+    except KeyboardInterrupt:
+        # The builds are children of this process and get the signal as well.
+        print('[!] Interrupted')
+        sys.exit(1)
+    scheduler.report(time.monotonic() - start_ts)
+
+    timings_path.parent.mkdir(parents=True, exist_ok=True)
+    timings_path.write_text(json.dumps(scheduler.timings(), indent=4, sort_keys=True))
+    sys.exit(0 if succeeded else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for the artifacts produced by build.sh.
+
+Each (target, mode) build is identified by a key derived from
+  - the content of the target's source tree (src/),
+  - the body of the config.sh functions executed for the mode (and the readonly variables they may use),
+  - the identity of the compilers referenced by these functions, including the pass plugins
+    and runtime libraries shipped with compiler wrappers and the LLVM installation they use,
+  - the build-relevant variables exported by the caller (e.g., FT_HOOK_INS or AFL_LLVM_LAF_*).
+If the artifact directories of the mode already correspond to the key, nothing is done.
+Otherwise, the artifacts are restored from the cache if available, or built via build.sh
+and stored in the cache afterwards.
+
+Usage:
+    ./build_cache.py <target-path> <mode>
+The modes are the same as for build.sh. `src` and `deps` are not cached.
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BINARIES_DIR = Path(__file__).resolve().parent
+BUILD_SCRIPT = BINARIES_DIR / 'build.sh'
+DEFAULT_CACHE_DIR = Path(os.environ.get('FT_BUILD_CACHE', '~/.cache/fuzztruction-builds')).expanduser()
+
+# config.sh functions executed by build.sh for each cacheable mode.
+MODE_TO_FUNCTIONS: Dict[str, List[str]] = {
+    'ft': ['build_ft'],
+    'afl': ['build_afl'],
+    'symcc': ['build_symcc', 'build_afl_symcc'],
+    'vanilla': ['build_vanilla'],
+}
+# Directory (relative to the target's directory) each function builds into.
+FUNCTION_TO_ARTIFACT_DIR = {
+    'build_ft': 'ft',
+    'build_afl': 'afl',
+    'build_symcc': 'symcc',
+    'build_afl_symcc': 'afl_symcc',
+    'build_vanilla': 'vanilla',
+}
+# Modes run in this order by `all`, mirroring build.sh.
+ALL_MODES = ['src', 'deps', 'ft', 'afl', 'symcc', 'vanilla']
+
+# Variables of the caller's environment that influence the build output.
+ENV_PREFIXES = ('FT_', 'AFL_', 'SYMCC_', 'DEB_')
+ENV_VARIABLES = ('CC', 'CXX', 'CFLAGS', 'CXXFLAGS', 'LDFLAGS')
+# Variables that only affect how a build is executed, not its output.
+ENV_IGNORED = ('FT_BUILD_CACHE', 'FT_BUILD_JOBS')
+
+# Compilers that are always part of the key, since the wrappers used by the configs
+# (e.g., afl-clang-fast) delegate to them.
+BASE_COMPILERS = ('clang', 'gcc')
+# Compiler wrappers each mode builds with. They are part of the key even if a config
+# injects them in a way not found by `referenced_compilers`.
+MODE_COMPILERS: Dict[str, List[str]] = {
+    'ft': ['/home/user/fuzztruction/generator/pass/fuzztruction-source-clang-fast'],
+    'afl': ['afl-clang-fast'],
+    'symcc': ['/symcc/symcc', 'afl-clang-fast'],
+    'vanilla': [],
+}
+# Files next to a compiler wrapper that are loaded by it (LLVM passes) or linked into the
+# artifacts (runtimes), e.g., Fuzztruction's pass or AFL++'s afl-compiler-rt.o.
+COMPANION_SUFFIXES = ('.so', '.a', '.o', '.bc')
+
+# Name of the file inside each artifact directory that records the key it was built for.
+KEY_FILE = '.build-key'
+
+
+def hash_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open('rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_tree(root: Path, jobs: int) -> str:
+    """
+    Hash the content, names, permissions, and symlinks of all files below `root`.
+    Version control metadata is ignored.
+    """
+    entries = []
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in ('.git', '.hg', '.svn'))
+        for name in sorted(filenames):
+            path = Path(dirpath) / name
+            rel = path.relative_to(root).as_posix()
+            if path.is_symlink():
+                entries.append(f'L {rel} {os.readlink(path)}')
+            elif path.is_file():
+                executable = os.access(path, os.X_OK)
+                entries.append(None)
+                files.append((len(entries) - 1, rel, executable, path))
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        digests = executor.map(lambda e: hash_file(e[3]), files)
+        for (idx, rel, executable, _), digest in zip(files, digests):
+            entries[idx] = f'F {rel} {int(executable)} {digest}'
+
+    h = hashlib.sha256()
+    for entry in entries:
+        h.update(entry.encode(errors='surrogateescape'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+def run_bash(target_dir: Path, script: str) -> str:
+    process = subprocess.run(['bash', '-c', script], cwd=target_dir, stdout=subprocess.PIPE,
+                             stderr=subprocess.DEVNULL, check=True)
+    return process.stdout.decode(errors='replace')
+
+
+def function_bodies(target_dir: Path, functions: List[str]) -> str:
+    """
+    The normalized bodies of `functions` as defined by the target's config.sh, including
+    the bodies of the config's functions they call and readonly variables (e.g., version
+    strings) defined by the config.
+    """
+    builtin_readonly = run_bash(target_dir, 'readonly -p')
+    builtin_names = set(re.findall(r'^declare -\S+ (\w+)', builtin_readonly, re.MULTILINE))
+    output = run_bash(target_dir, 'source config.sh > /dev/null; declare -f; echo "#readonly"; readonly -p')
+    definitions, _, readonly = output.partition('#readonly\n')
+
+    # `declare -f` prints each function as `name () ` followed by its body up to a `}` line.
+    defined: Dict[str, str] = {}
+    for match in re.finditer(r'^(\S+) \(\) \n\{ ?\n.*?^\}$', definitions, re.MULTILINE | re.DOTALL):
+        defined[match.group(1)] = match.group(0)
+    used = []
+    pending = list(functions)
+    while pending:
+        function = pending.pop(0)
+        if function in used or function not in defined:
+            continue
+        used.append(function)
+        body = defined[function]
+        pending.extend(f for f in defined if f not in used and re.search(rf'(?<![\w-]){re.escape(f)}(?![\w-])', body.split('\n', 1)[1]))
+
+    lines = [defined[f] for f in functions if f in defined] + [defined[f] for f in sorted(used) if f not in functions]
+    for line in readonly.splitlines():
+        match = re.match(r'^declare -\S+ (\w+)', line)
+        if match and match.group(1) in builtin_names:
+            continue
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def companion_dirs(compiler: Path) -> List[Path]:
+    """
+    Directories containing the pass plugins and runtime libraries of the compiler wrapper
+    at `compiler`. Wrappers installed into a bin/ directory (e.g., AFL++) keep them in
+    <prefix>/lib/<name>, the others (e.g., Fuzztruction and SymCC) in their build tree.
+    """
+    if compiler.parent.name != 'bin':
+        return [compiler.parent]
+    dirs = [compiler.parent.parent / 'lib' / compiler.name.split('-')[0]]
+    if compiler.name.startswith('afl-') and 'AFL_PATH' in os.environ:
+        dirs.append(Path(os.environ['AFL_PATH']))
+    return dirs
+
+
+def hash_companions(dirs: List[Path]) -> str:
+    h = hashlib.sha256()
+    for root in dirs:
+        if not root.is_dir():
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in ('.git', '.hg', '.svn'))
+            for name in sorted(filenames):
+                path = Path(dirpath) / name
+                if not (path.suffix in COMPANION_SUFFIXES or '.so.' in name) or not path.is_file():
+                    continue
+                h.update(f'{path} {hash_file(path)}\n'.encode(errors='surrogateescape'))
+    return h.hexdigest()
+
+
+def llvm_identity(version: str) -> str:
+    """
+    Hash of the LLVM installation a clang-based compiler (or a wrapper passing --version
+    through to clang) reports in its version output.
+    """
+    match = re.search(r'^InstalledDir: (.+)$', version, re.MULTILINE)
+    if match is None:
+        return 'none'
+    bin_dir = Path(match.group(1).strip())
+    lib_dir = bin_dir.parent / 'lib'
+    files = [bin_dir / 'clang', *sorted(lib_dir.glob('libLLVM*.so*')), *sorted(lib_dir.glob('libclang-cpp*.so*'))]
+    h = hashlib.sha256()
+    for path in sorted({f.resolve() for f in files if f.is_file()}):
+        h.update(f'{path} {hash_file(path)}\n'.encode(errors='surrogateescape'))
+    return f'{bin_dir} {h.hexdigest()}'
+
+
+# The toolchain does not change while builds are running, thus it is only hashed once per compiler.
+@functools.lru_cache(maxsize=None)
+def compiler_identity(compiler: str) -> str:
+    path = shutil.which(compiler)
+    if path is None:
+        return f'{compiler}: missing'
+    path = Path(path).resolve()
+    try:
+        version = subprocess.run([path.as_posix(), '--version'], stdout=subprocess.PIPE,
+                                 stderr=subprocess.STDOUT, timeout=30).stdout.decode(errors='replace')
+    except (OSError, subprocess.TimeoutExpired):
+        version = ''
+    identity = f'{compiler}: {path} {hash_file(path)} {version.strip()} llvm: {llvm_identity(version)}'
+    if compiler not in BASE_COMPILERS:
+        identity += f' companions: {hash_companions(companion_dirs(path))}'
+    return identity
+
+
+def referenced_compilers(bodies: str, mode: str) -> List[str]:
+    """
+    The compilers used by `mode`, including those assigned in the bodies or injected into
+    build files via sed (e.g., s@CC=.*@CC=/symcc/symcc@g).
+    """
+    compilers = set(BASE_COMPILERS) | set(MODE_COMPILERS.get(mode, []))
+    # A lookahead, since sed expressions contain the pattern and the replacement (s/CC=.../CC=.../g).
+    for match in re.finditer(r'(?=\b(?:CC|CXX)=["\']?([^"\'\s;@]+))', bodies.replace('\\/', '/')):
+        value = re.sub(r'/g?$', '', match.group(1))
+        if value and not value.startswith('$'):
+            compilers.add(value)
+    return sorted(compilers)
+
+
+def build_env() -> Dict[str, str]:
+    return {
+        key: value for key, value in sorted(os.environ.items())
+        if (key.startswith(ENV_PREFIXES) or key in ENV_VARIABLES) and key not in ENV_IGNORED
+    }
+
+
+class BuildCache:
+    """
+    Local, content-addressed store of build artifacts.
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, jobs: Optional[int] = None):
+        self._cache_dir = cache_dir
+        self._jobs = jobs or os.cpu_count() or 1
+        self._source_hashes: Dict[Path, str] = {}
+        self._source_hashes_lock = threading.Lock()
+
+    def source_hash(self, target_dir: Path) -> str:
+        # All modes of a target share the same source tree, thus it is only hashed once.
+        # The lock is held while hashing, such that concurrent builds of the same target
+        # do not hash the tree twice.
+        with self._source_hashes_lock:
+            if target_dir not in self._source_hashes:
+                src = target_dir / 'src'
+                self._source_hashes[target_dir] = hash_tree(src, self._jobs) if src.is_dir() else 'missing'
+            return self._source_hashes[target_dir]
+
+    def key_components(self, target_dir: Path, mode: str) -> Dict[str, object]:
+        bodies = function_bodies(target_dir, MODE_TO_FUNCTIONS[mode])
+        return {
+            'target': target_dir.name,
+            'mode': mode,
+            'source': self.source_hash(target_dir),
+            'functions': hashlib.sha256(bodies.encode()).hexdigest(),
+            'compilers': [compiler_identity(c) for c in referenced_compilers(bodies, mode)],
+            'env': build_env(),
+        }
+
+    def key(self, target_dir: Path, mode: str) -> str:
+        components = self.key_components(target_dir, mode)
+        return hashlib.sha256(json.dumps(components, sort_keys=True).encode()).hexdigest()
+
+    def _archive_path(self, target_dir: Path, mode: str, key: str) -> Path:
+        return self._cache_dir / target_dir.name / f'{mode}-{key}.tar'
+
+    @staticmethod
+    def artifact_dirs(target_dir: Path, mode: str) -> List[Path]:
+        return [target_dir / FUNCTION_TO_ARTIFACT_DIR[f] for f in MODE_TO_FUNCTIONS[mode]]
+
+    @staticmethod
+    def is_up_to_date(target_dir: Path, mode: str, key: str) -> bool:
+        for artifact_dir in BuildCache.artifact_dirs(target_dir, mode):
+            key_file = artifact_dir / KEY_FILE
+            if not key_file.is_file() or key_file.read_text().strip() != key:
+                return False
+        return True
+
+    @staticmethod
+    def _mark(target_dir: Path, mode: str, key: Optional[str]):
+        for artifact_dir in BuildCache.artifact_dirs(target_dir, mode):
+            key_file = artifact_dir / KEY_FILE
+            if key is None:
+                key_file.unlink(missing_ok=True)
+            else:
+                key_file.write_text(key + '\n')
+
+    def restore(self, target_dir: Path, mode: str, key: str) -> bool:
+        archive = self._archive_path(target_dir, mode, key)
+        if not archive.is_file():
+            return False
+        for artifact_dir in BuildCache.artifact_dirs(target_dir, mode):
+            shutil.rmtree(artifact_dir, ignore_errors=True)
+        subprocess.check_call(['tar', '-xf', archive.as_posix(), '-C', target_dir.as_posix()])
+        return BuildCache.is_up_to_date(target_dir, mode, key)
+
+    def store(self, target_dir: Path, mode: str, key: str):
+        archive = self._archive_path(target_dir, mode, key)
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        dirs = [d.name for d in BuildCache.artifact_dirs(target_dir, mode)]
+        # Write to a temporary file first, such that concurrent builds never see partial archives.
+        fd, tmp = tempfile.mkstemp(dir=archive.parent, suffix='.tmp')
+        os.close(fd)
+        try:
+            subprocess.check_call(['tar', '-cf', tmp, '-C', target_dir.as_posix(), *dirs])
+            os.replace(tmp, archive)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def build(self, target_dir: Path, mode: str, env: Optional[Dict[str, str]] = None, force: bool = False,
+              stdout=None, pass_fds=()) -> str:
+        """
+        Make sure the artifacts of `mode` are up-to-date. Returns how this was achieved, i.e.,
+        'up-to-date', 'restored', or 'built'. Raises CalledProcessError if the build fails.
+        `pass_fds` are kept open for build.sh (e.g., the pipe of a make jobserver).
+        """
+        if mode not in MODE_TO_FUNCTIONS:
+            subprocess.check_call([BUILD_SCRIPT.as_posix(), target_dir.as_posix(), mode], env=env,
+                                  stdout=stdout, stderr=subprocess.STDOUT if stdout else None, pass_fds=pass_fds)
+            return 'built'
+
+        key = self.key(target_dir, mode)
+        if not force:
+            if BuildCache.is_up_to_date(target_dir, mode, key):
+                return 'up-to-date'
+            if self.restore(target_dir, mode, key):
+                return 'restored'
+
+        BuildCache._mark(target_dir, mode, None)
+        subprocess.check_call([BUILD_SCRIPT.as_posix(), target_dir.as_posix(), mode], env=env,
+                              stdout=stdout, stderr=subprocess.STDOUT if stdout else None, pass_fds=pass_fds)
+        BuildCache._mark(target_dir, mode, key)
+        self.store(target_dir, mode, key)
+        return 'built'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a target via build.sh while reusing cached artifacts.')
+    parser.add_argument('target', type=Path, help='Path of the target directory (containing config.sh).')
+    parser.add_argument('mode', nargs='?', default='all', help='Mode passed to build.sh.')
+    parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR, help=f'Cache location (default: {DEFAULT_CACHE_DIR}).')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if cached artifacts are available.')
+    parser.add_argument('--print-key', action='store_true', help='Print the components of the cache key and exit.')
+    args = parser.parse_args()
+
+    target_dir = args.target.resolve()
+    if not (target_dir / 'config.sh').is_file():
+        parser.error(f'Config could not be found at: {target_dir / "config.sh"}')
+    if args.mode != 'all' and args.mode not in ALL_MODES + ['source']:
+        parser.error(f'Invalid mode {args.mode}')
+
+    cache = BuildCache(args.cache_dir)
+    if args.print_key:
+        if args.mode not in MODE_TO_FUNCTIONS:
+            parser.error(f'Mode {args.mode} is not cached')
+        print(json.dumps(cache.key_components(target_dir, args.mode), indent=4))
+        return
+
+    modes = ALL_MODES if args.mode == 'all' else [args.mode]
+    failed = False
+    for mode in modes:
+        start_ts = time.monotonic()
+        try:
+            result = cache.build(target_dir, mode, force=args.force)
+        except subprocess.CalledProcessError:
+            print(f'[!] {target_dir.name}: {mode} failed')
+            failed = True
+            if args.mode != 'all':
+                break
+        else:
+            print(f'[+] {target_dir.name}: {mode} {result} ({time.monotonic() - start_ts:.0f}s)')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,7 +22,7 @@ function build_ft {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -48,7 +48,7 @@ function build_afl {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -76,7 +76,7 @@ function build_afl_symcc {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -98,7 +98,7 @@ function build_symcc {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -121,7 +121,7 @@ function build_vanilla {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -149,7 +149,7 @@ function build_asan {
     export DEB_LDFLAGS_SET="-fPIC -lpthread -ldl -fsanitize=address"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -16,7 +16,7 @@ function build_ft {
     export CXXFLAGS="-v -O3 -fPIC"
     export LDFLAGS="-fPIC -ldl"
     ./configure
-    make -j
+    make $MAKE_JOBS
     pushd contrib/examples > /dev/null
     $CC pngtopng.c -Wl,-rpath $(readlink -f ../../.libs) -L $(readlink -f ../../.libs) -lpng16 -o pngtopng
     popd > /dev/null
@@ -38,7 +38,7 @@ function build_afl {
     export CXXFLAGS="-v -O3 -g -fPIC"
 
     ./configure
-    make -j
+    make $MAKE_JOBS
     pushd contrib/examples > /dev/null
     $CC pngtopng.c -Wl,-rpath $(readlink -f ../../.libs) -L $(readlink -f ../../.libs) -lpng16 -o pngtopng
     popd > /dev/null
@@ -59,7 +59,7 @@ function build_symcc {
     export CXXFLAGS="-v -O3 -g -fPIC"
 
     ./configure
-    make -j
+    make $MAKE_JOBS
     pushd contrib/examples > /dev/null
     $CC pngtopng.c -Wl,-rpath $(readlink -f ../../.libs) -L $(readlink -f ../../.libs) -lpng16 -o pngtopng
     popd > /dev/null
@@ -84,7 +84,7 @@ function build_afl_symcc {
     export CXXFLAGS="-v -O3 -g -fPIC"
 
     ./configure
-    make -j
+    make $MAKE_JOBS
     pushd contrib/examples > /dev/null
     $CC pngtopng.c -Wl,-rpath $(readlink -f ../../.libs) -L $(readlink -f ../../.libs) -lpng16 -o pngtopng
     popd > /dev/null
@@ -99,7 +99,7 @@ function build_vanilla {
     pushd vanilla/libpng > /dev/null
     export CC="gcc"
     ./configure
-    make -j
+    make $MAKE_JOBS
     pushd contrib/examples > /dev/null
     $CC pngtopng.c -Wl,-rpath $(readlink -f ../../.libs) -L $(readlink -f ../../.libs) -lpng16 -o pngtopng
     popd > /dev/null
@@ -20,7 +20,7 @@ function build_ft {
     export FT_HOOK_INS=store,load,select,icmp
     export CC=/home/user/fuzztruction/generator/pass/fuzztruction-source-clang-fast
     export CXX=/home/user/fuzztruction/generator/pass/fuzztruction-source-clang-fast++
-    make -j -C nss nss_build_all USE_64=1 BUILD_OPT=1
+    make $MAKE_JOBS -C nss nss_build_all USE_64=1 BUILD_OPT=1
 
     popd > /dev/null
 }
@@ -36,7 +36,7 @@ function build_afl {
     export AFL_LLVM_LAF_SPLIT_COMPARES=1
     export CC="afl-clang-fast"
     export CXX="afl-clang-fast++"
-    make -j -C nss nss_build_all USE_64=1 BUILD_OPT=1
+    make $MAKE_JOBS -C nss nss_build_all USE_64=1 BUILD_OPT=1
 
     popd > /dev/null
 }
@@ -51,7 +51,7 @@ function build_symcc {
     export SYMCC_LIBCXX_PATH=/libcxx_symcc
     export CC="/symcc/symcc"
     export CXX="/symcc/sym++"
-    make -j -C nss nss_build_all USE_64=1 BUILD_OPT=0
+    make $MAKE_JOBS -C nss nss_build_all USE_64=1 BUILD_OPT=0
 
     popd > /dev/null
 }
@@ -70,7 +70,7 @@ function build_afl_symcc {
 
     export CC="afl-clang-fast"
     export CXX="afl-clang-fast++"
-    make -j -C nss nss_build_all USE_64=1 BUILD_OPT=1
+    make $MAKE_JOBS -C nss nss_build_all USE_64=1 BUILD_OPT=1
 
     popd > /dev/null
 }
@@ -84,7 +84,7 @@ function build_vanilla {
     export CC="clang"
     export CXX="clang++"
 
-    make -j -C nss nss_build_all USE_64=1
+    make $MAKE_JOBS -C nss nss_build_all USE_64=1
 
     popd > /dev/null
 }
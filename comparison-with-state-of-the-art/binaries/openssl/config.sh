@@ -15,8 +15,8 @@ function build_ft {
     sed -i 's/CXX=$(CROSS_COMPILE)g++.*/CXX=\/home\/user\/fuzztruction\/generator\/pass\/fuzztruction-source-clang-fast++/g' Makefile
     sed -i 's/CFLAGS=.*/CFLAGS=-O3 -g -fPIC -DFUZZING_BUILD_MODE_UNSAFE_FOR_PRODUCTION -DFT_STATIC_SEED/g' Makefile
     sed -i 's/CXXFLAGS=.*/CXXFLAGS=-O3 -g -fPIC -DFUZZING_BUILD_MODE_UNSAFE_FOR_PRODUCTION -DFT_STATIC_SEED/g' Makefile
-    LDCMD=clang++ make -j || true
-    make -j
+    LDCMD=clang++ make $MAKE_JOBS || true
+    make $MAKE_JOBS
     popd > /dev/null
 }
 
@@ -35,7 +35,7 @@ function build_afl {
     sed -i 's/CXX=$(CROSS_COMPILE)g++.*/CXX=afl-clang-fast++/g' Makefile
     sed -i 's/CFLAGS=.*/CFLAGS=-O3 -g -fPIC -DFUZZING_BUILD_MODE_UNSAFE_FOR_PRODUCTION -DFT_STATIC_SEED/g' Makefile
     sed -i 's/CXXFLAGS=.*/CXXFLAGS=-O3 -g -fPIC -DFUZZING_BUILD_MODE_UNSAFE_FOR_PRODUCTION -DFT_STATIC_SEED/g' Makefile
-    bear make -j || true
+    bear make $MAKE_JOBS || true
     make
     popd > /dev/null
 }
@@ -53,7 +53,7 @@ function build_afl_symcc {
     sed -i 's/CXX=$(CROSS_COMPILE)g++.*/CXX=afl-clang-fast++/g' Makefile
     sed -i 's/CFLAGS=.*/CFLAGS=-O3 -g -fPIC -DFUZZING_BUILD_MODE_UNSAFE_FOR_PRODUCTION -DFT_STATIC_SEED/g' Makefile
     sed -i 's/CXXFLAGS=.*/CXXFLAGS=-O3 -g -fPIC -DFUZZING_BUILD_MODE_UNSAFE_FOR_PRODUCTION -DFT_STATIC_SEED/g' Makefile
-    bear make -j || true
+    bear make $MAKE_JOBS || true
     make
     popd > /dev/null
 }
@@ -69,7 +69,7 @@ function build_symcc {
     sed -i 's@CXX=$(CROSS_COMPILE)g++.*@CXX=/symcc/sym++@g' Makefile
     sed -i 's/CFLAGS=.*/CFLAGS=-O3 -g -fPIC -DFUZZING_BUILD_MODE_UNSAFE_FOR_PRODUCTION -DFT_STATIC_SEED/g' Makefile
     sed -i 's/CXXFLAGS=.*/CXXFLAGS=-O3 -g -fPIC -DFUZZING_BUILD_MODE_UNSAFE_FOR_PRODUCTION -DFT_STATIC_SEED/g' Makefile
-    bear make -j || true
+    bear make $MAKE_JOBS || true
     make
     popd > /dev/null
 }
@@ -80,7 +80,7 @@ function build_vanilla {
     cp -r src/openssl vanilla/
     pushd vanilla/openssl > /dev/null
     ./config -d shared no-threads
-    make -j || true
+    make $MAKE_JOBS || true
     make
     popd > /dev/null
 }
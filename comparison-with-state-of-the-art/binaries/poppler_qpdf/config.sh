@@ -22,7 +22,7 @@ function build_ft {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
 
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
 
     popd > /dev/null
 
@@ -39,7 +39,7 @@ function build_ft {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
 
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -62,7 +62,7 @@ function build_afl {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
 
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -84,7 +84,7 @@ function build_symcc {
 
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
     # fails because of dpkg-shlibdeps missing deps for custom std++
-    dpkg-buildpackage --no-sign -jauto -b || true
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b || true
     popd > /dev/null
 }
 
@@ -109,7 +109,7 @@ function build_afl_symcc {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
 
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -127,7 +127,7 @@ function build_vanilla {
     export DEB_CXXFLAGS_SET="-g"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -jauto -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-auto} -b
     popd > /dev/null
 }
 
@@ -27,7 +27,7 @@ function build_ft {
     export DEB_CXXFLAGS_SET="-v -O3 -g -fPIC"
     export DEB_LDFLAGS_SET="-fPIC -ldl"
 
-    dpkg-buildpackage --no-sign -j -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-} -b
     popd > /dev/null
 
     # build zip
@@ -45,7 +45,7 @@ function build_ft {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -j -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-} -b
     popd > /dev/null
 }
 
@@ -69,7 +69,7 @@ function build_afl {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -j -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-} -b
     popd > /dev/null
 
     # build libbz2
@@ -89,7 +89,7 @@ function build_afl {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -j -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-} -b
     popd > /dev/null
 }
 
@@ -111,7 +111,7 @@ function build_symcc {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -j -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-} -b
     popd > /dev/null
 
     # build libbz2
@@ -129,7 +129,7 @@ function build_symcc {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -j -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-} -b
     popd > /dev/null
 }
 
@@ -155,7 +155,7 @@ function build_afl_symcc {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -j -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-} -b
     popd > /dev/null
 
     # build libbz2
@@ -177,7 +177,7 @@ function build_afl_symcc {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -j -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-} -b
     popd > /dev/null
 }
 
@@ -198,7 +198,7 @@ function build_vanilla {
     export DEB_LDFLAGS_SET="-fPIC -ldl"
     export DEB_BUILD_OPTIONS="nodocs nostrip nocheck nomult nocross nohppa"
 
-    dpkg-buildpackage --no-sign -j -b
+    dpkg-buildpackage --no-sign -j${FT_BUILD_JOBS:-} -b
     popd > /dev/null
 }
 
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Measure how much targets slow each other down if they are fuzzed concurrently.
+
+Each target is first fuzzed alone for a short window and afterwards together with
+every other target (or, via --group-size, in larger groups). The slowdown of the
+execution speed and of the queue growth (used as proxy for the coverage rate)
+relative to the solo run is written as interference matrix that can be passed to
+eval.py via the `interference` section of campaign.yml.
+"""
+
+import argparse
+import itertools
+import logging
+import sys
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from statistics import mean
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+import eval as campaign
+from eval import (CampaignConfig, EvaluationCampaign, Fuzzer, FuzzingJob,
+                  JobOptions, JobState, Preflight, PreflightError,
+                  SYMCC_UNSUPPORTED_TARGETS, Target)
+
+# Run ids used for calibration jobs. They are chosen such that they do not collide
+# with the workdirs of regular campaign runs.
+CALIBRATION_RUN_ID = 9000
+# Interval the throughput of the running jobs is sampled at.
+SAMPLE_INTERVAL_S = 15
+# Samples taken during this time after starting a window are ignored, since
+# the fuzzers are still calibrating their seeds.
+WARMUP_S = 60
+
+
+@dataclass
+class Throughput:
+    """
+    Throughput of a single target during a calibration window.
+    """
+    execs_per_sec: float
+    # New queue entries per minute.
+    coverage_rate: float
+
+
+def slowdown(measured: float, baseline: float) -> float:
+    """
+    Relative slowdown of `measured` compared to `baseline` (0 = no slowdown, 1 = stalled).
+    """
+    if baseline <= 0:
+        return 0.0
+    return max(0.0, 1.0 - measured / baseline)
+
+
+class CalibrationRun:
+    """
+    Fuzz a group of targets concurrently for a fixed window and measure the throughput of each.
+    """
+
+    def __init__(self, config: CampaignConfig, group: Tuple[Target, ...], fuzzer: Fuzzer, window_s: int,
+                 log_dir: Path, log: logging.LoggerAdapter):
+        self._group = group
+        self._window_s = window_s
+        self.log = log
+        options = JobOptions(watchdog=config.watchdog, collect_results=False)
+        self._jobs: List[FuzzingJob] = []
+        for idx, target in enumerate(group):
+            # The same target might be part of the group twice, thus the run id needs to differ.
+            run_id = CALIBRATION_RUN_ID + idx
+            job = EvaluationCampaign.create_job(target, run_id, window_s, config.cores_per_target, fuzzer,
+                                                log_dir, config.results_path, options)
+            self._jobs.append(job)
+
+    def _check_overdue(self):
+        """
+        Fail the window if any job hangs, since the throughput of the others is not comparable anymore.
+        """
+        for job in self._jobs:
+            if job.phase_overdue():
+                self.log.error(f'Job {job} exceeded the expected duration of {job.state()}')
+                job.declare_dead()
+                for other in self._jobs:
+                    if other is not job:
+                        other.request_exit()
+                raise RuntimeError(f'Calibration job {job} exceeded the expected duration, aborting the window')
+
+    def run(self) -> List[Throughput]:
+        names = ', '.join(t.name for t in self._group)
+        self.log.info(f'Calibrating [{names}] for {self._window_s}s')
+
+        for job in self._jobs:
+            job.start()
+        start_ts = time.monotonic()
+
+        execs_per_sec: List[List[float]] = [[] for _ in self._jobs]
+        # (timestamp, queue size) of the first and last sample after the warmup.
+        first_queue_size: List[Optional[Tuple[float, int]]] = [None] * len(self._jobs)
+        last_queue_size: List[Optional[Tuple[float, int]]] = [None] * len(self._jobs)
+        try:
+            # Wait for the jobs to terminate instead of only to stop fuzzing, such that
+            # the watchdog also covers the phases after fuzzing.
+            while any(job.state() not in (JobState.FINISHED, JobState.FAILED) for job in self._jobs):
+                time.sleep(SAMPLE_INTERVAL_S)
+                self._check_overdue()
+                now = time.monotonic()
+                if now - start_ts < WARMUP_S:
+                    continue
+                for idx, job in enumerate(self._jobs):
+                    if job.state() != JobState.FUZZING:
+                        continue
+                    execs_per_sec[idx].append(job.fuzzer_stats().execs_per_sec)
+                    sample = (now, job.queue_size())
+                    if first_queue_size[idx] is None:
+                        first_queue_size[idx] = sample
+                    last_queue_size[idx] = sample
+        except KeyboardInterrupt:
+            for job in self._jobs:
+                job.request_exit()
+            raise
+        finally:
+            for job in self._jobs:
+                job.join()
+                job.purge_workdir()
+
+        ret = []
+        for idx, job in enumerate(self._jobs):
+            if job.state() != JobState.FINISHED:
+                raise RuntimeError(f'Calibration job {job} terminated with state {job.state()}')
+            coverage_rate = 0.0
+            if first_queue_size[idx] is not None and last_queue_size[idx][0] > first_queue_size[idx][0]:
+                (first_ts, first), (last_ts, last) = first_queue_size[idx], last_queue_size[idx]
+                coverage_rate = (last - first) / ((last_ts - first_ts) / 60)
+            throughput = Throughput(
+                execs_per_sec=mean(execs_per_sec[idx]) if execs_per_sec[idx] else 0.0,
+                coverage_rate=coverage_rate,
+            )
+            self.log.info(f'{job.target().name}: {throughput}')
+            ret.append(throughput)
+        return ret
+
+
+def calibrate(config: CampaignConfig, targets: List[Target], fuzzer: Fuzzer, window_s: int, group_size: int,
+              log_dir: Path, log: logging.LoggerAdapter) -> Dict:
+    """
+    Run all calibration windows and return the results as dict suitable to be dumped as YAML.
+    """
+    if group_size * config.cores_per_target > config.cores_total:
+        raise ValueError(f'A group of {group_size} targets needs more than cores-total={config.cores_total} cores')
+
+    solo: Dict[str, Throughput] = {}
+    for target in targets:
+        solo[target.name] = CalibrationRun(config, (target,), fuzzer, window_s, log_dir, log).run()[0]
+
+    groups = []
+    matrix: Dict[str, Dict[str, float]] = {t.name: {} for t in targets}
+    for group in itertools.combinations_with_replacement(targets, group_size):
+        throughputs = CalibrationRun(config, group, fuzzer, window_s, log_dir, log).run()
+        group_slowdowns = {}
+        for target, throughput in zip(group, throughputs):
+            baseline = solo[target.name]
+            exec_slowdown = slowdown(throughput.execs_per_sec, baseline.execs_per_sec)
+            coverage_slowdown = slowdown(throughput.coverage_rate, baseline.coverage_rate)
+            group_slowdowns[target.name] = {
+                'execs_per_sec': round(exec_slowdown, 4),
+                'coverage_rate': round(coverage_slowdown, 4),
+            }
+            # The matrix records the worst slowdown of a target observed next to each other target.
+            worst = max(exec_slowdown, coverage_slowdown)
+            for other in group:
+                if other is target and group.count(target) == 1:
+                    continue
+                current = matrix[target.name].get(other.name, 0.0)
+                matrix[target.name][other.name] = round(max(current, worst), 4)
+        groups.append({
+            'targets': [t.name for t in group],
+            'slowdown': group_slowdowns,
+        })
+
+    return {
+        'fuzzer': fuzzer.value,
+        'window_s': window_s,
+        'cores_per_target': config.cores_per_target,
+        'solo': {name: {'execs_per_sec': round(t.execs_per_sec, 2), 'coverage_rate': round(t.coverage_rate, 2)} for name, t in solo.items()},
+        'groups': groups,
+        'matrix': matrix,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the interference of concurrently fuzzed targets.')
+    parser.add_argument('--config', type=Path, default=Path('campaign.yml'), help='Campaign config defining targets and cores per target.')
+    parser.add_argument('--fuzzer', type=Fuzzer, default=Fuzzer.AFLPP, help='Fuzzer used for calibration (default: AFL++).')
+    parser.add_argument('--window', default='10m', help='Length of each calibration window (\\d+[smhd]).')
+    parser.add_argument('--group-size', type=int, default=2, help='Number of targets fuzzed concurrently.')
+    parser.add_argument('--targets', nargs='+', help='Only calibrate the given targets.')
+    parser.add_argument('-o', '--output', type=Path, default=Path('interference.yml'), help='Where to store the interference matrix.')
+    args = parser.parse_args()
+
+    if args.group_size < 2:
+        parser.error('--group-size must be >= 2')
+
+    log_dir = Path('logs-calibration')
+    log = campaign.setup_logger(log_dir)
+    campaign.check_env(log)
+
+    config = CampaignConfig.from_path(args.config)
+    targets = list(config.targets)
+    if args.targets:
+        unknown = set(args.targets) - {t.name for t in targets}
+        if unknown:
+            parser.error(f'Unknown targets: {", ".join(sorted(unknown))}')
+        targets = [t for t in targets if t.name in args.targets]
+    if args.fuzzer == Fuzzer.SYMCC:
+        targets = [t for t in targets if t.name not in SYMCC_UNSUPPORTED_TARGETS]
+
+    # Only check what is calibrated, coverage is not computed during calibration.
+    calibration_config = replace(config, targets=tuple(targets), fuzzers=(args.fuzzer,), coverage=None)
+    try:
+        Preflight(calibration_config, log).run()
+    except PreflightError as e:
+        log.error(str(e))
+        campaign.shutdown_logger()
+        sys.exit(1)
+
+    window_s = CampaignConfig.parse_timeout_as_seconds(args.window)
+    try:
+        result = calibrate(config, targets, args.fuzzer, window_s, args.group_size, log_dir, log)
+    except KeyboardInterrupt:
+        log.info('Got keyboard interrupt, stopping calibration.')
+    except RuntimeError as e:
+        log.error(str(e))
+        campaign.shutdown_logger()
+        sys.exit(1)
+    else:
+        args.output.write_text(yaml.dump(result, sort_keys=False))
+        log.info(f'Interference matrix written to {args.output}')
+
+    campaign.shutdown_logger()
+
+
+if __name__ == '__main__':
+    main()
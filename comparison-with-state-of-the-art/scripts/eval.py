@@ -1,24 +1,35 @@
 #!/usr/bin/env python3
 
+import atexit
+import copy
 import enum
+import hashlib
+import json
+import os
 import re
 import shutil
 import subprocess
+import sys
+import tempfile
 from sys import exc_info
 import time
 import logging
+import logging.handlers
 import psutil
 from collections import deque
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from distutils.command.config import config
 from pathlib import Path
-from queue import Queue
-from threading import Thread
-from typing import Dict, List, NoReturn
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Deque, Dict, List, NoReturn, Optional, Set, Tuple
 from numpy import log
 
 import yaml
 
+from trace_store import TRACE_STORE_DIR, TraceStore
+
 
 class JobState(enum.Enum):
     READY = 'READY'
@@ -36,25 +47,309 @@ class Fuzzer(enum.Enum):
     WEIZZ = 'WEIZZ'
     SYMCC = 'SYMCC'
 
-@dataclass
+TRACE_STORE_SCRIPT = Path(__file__).resolve().parent / 'trace_store.py'
+
+# Targets SYMCC fails to build for.
+SYMCC_UNSUPPORTED_TARGETS = ("7zip_7zip", "7zip-enc_7zip-dec", "sign_vfychain")
+
+@dataclass(frozen=True)
+class Binary:
+    """
+    A binary referenced by a target config, e.g., the source or sink application.
+    """
+    # Section of the target config the binary is defined in, e.g., source or symcc.afl-bin.
+    role: str
+    path: Path
+    env: Tuple[Tuple[str, str], ...]
+    # Arguments the binary is executed with, where @@ is replaced by the input file.
+    args: Tuple[str, ...] = ()
+
+@dataclass(frozen=True)
 class Target():
+    """
+    A target as defined by its Fuzztruction config file. The config is only read once
+    when the campaign is loaded.
+    """
     name: str
     config: Path
+    work_directory: Path = field(repr=False)
+    # Seeds for the source application (used by Fuzztruction).
+    ft_input_dir: Path = field(repr=False)
+    # Seeds for the sink application (used by AFL++, WEIZZ, and SYMCC), None if the config lacks them.
+    other_input_dir: Optional[Path] = field(repr=False)
+    binaries: Tuple[Binary, ...] = field(repr=False)
 
     def workdir(self) -> Path:
-        cfg = yaml.load(self.config.read_text(), yaml.Loader)
-        return Path(cfg['work-directory'])
+        return self.work_directory
+
+    def binary(self, role: str) -> Optional[Binary]:
+        for binary in self.binaries:
+            if binary.role == role:
+                return binary
+        return None
+
+    @staticmethod
+    def parse_env(env: Optional[List[Dict[str, Any]]]) -> Tuple[Tuple[str, str], ...]:
+        if env is None:
+            return ()
+        ret = []
+        for entry in env:
+            for key, value in entry.items():
+                ret.append((str(key), str(value)))
+        return tuple(ret)
+
+    @staticmethod
+    def from_config(name: str, config: Path) -> 'Target':
+        """
+        Parse and validate the target config located at `config`.
+        Relative paths are interpreted relative to the config's directory.
+        """
+        try:
+            cfg = yaml.load(config.read_text(), yaml.Loader)
+        except (OSError, yaml.YAMLError) as e:
+            raise ValueError(f'{name}: Failed to load target config {config}: {e}')
+
+        if not isinstance(cfg, dict):
+            raise ValueError(f'{name}: Target config {config} is not a mapping')
+
+        def get_section(section: str) -> Dict[str, Any]:
+            attrs = cfg.get(section)
+            if not isinstance(attrs, dict):
+                raise ValueError(f'{name}: Target config {config} lacks section {section}')
+            return attrs
+
+        def get(section: Optional[str], key: str) -> Any:
+            attrs = cfg if section is None else get_section(section)
+            value = attrs.get(key)
+            if value is None:
+                key_path = key if section is None else f'{section}.{key}'
+                raise ValueError(f'{name}: Target config {config} lacks attribute {key_path}')
+            return value
+
+        def get_path(section: Optional[str], key: str) -> Path:
+            return (config.parent / Path(get(section, key)).expanduser()).resolve()
+
+        binaries = []
+        for section in ['source', 'sink', 'vanilla']:
+            attrs = get_section(section)
+            args = tuple(str(a) for a in attrs.get('arguments') or [])
+            binaries.append(Binary(section, get_path(section, 'bin-path'), Target.parse_env(attrs.get('env')), args))
+        if 'symcc' in cfg:
+            attrs = get_section('symcc')
+            binaries.append(Binary('symcc', get_path('symcc', 'bin-path'), Target.parse_env(attrs.get('env'))))
+            binaries.append(Binary('symcc.afl-bin', get_path('symcc', 'afl-bin-path'), Target.parse_env(attrs.get('afl-bin-env'))))
+
+        # Only required by the fuzzers using the sink's seeds, which is checked by Preflight.
+        other_input_dir = None
+        if isinstance(cfg.get('afl++'), dict) and cfg['afl++'].get('input-dir') is not None:
+            other_input_dir = get_path('afl++', 'input-dir')
+
+        return Target(
+            name=name,
+            config=config,
+            work_directory=Path(get(None, 'work-directory')),
+            ft_input_dir=get_path(None, 'input-directory'),
+            other_input_dir=other_input_dir,
+            binaries=tuple(binaries),
+        )
+
+@dataclass(frozen=True)
+class AdaptiveBudget:
+    """
+    Criterion used to stop a fuzzing run before its timeout once the growth
+    of the fuzzer's queue plateaued.
+    """
+    # Minimum time a job fuzzes before it might be stopped.
+    min_runtime_s: int
+    # Time window the queue growth is measured over.
+    window_s: int
+    # Minimum relative growth of the queue during `window_s` to continue fuzzing.
+    min_growth: float
+    # Interval the queue size is sampled at.
+    poll_interval_s: int = 60
+
+@dataclass(frozen=True)
+class Watchdog:
+    """
+    Bounds on the time a job may spend in each phase before it is considered hung.
+    The bounds are derived from the job's timeout.
+    """
+    # Time added to the expected duration of each phase.
+    grace_s: int = 15 * 60
+    # Expected duration of COVERAGE_TRACING relative to the fuzzing timeout.
+    tracing_factor: float = 2.0
+    # Expected duration of SYNCING_RESULTS relative to the fuzzing timeout.
+    syncing_factor: float = 0.5
+    # Time processes have to exit after SIGTERM before they are killed via SIGKILL.
+    kill_timeout_s: int = 60
+
+    def phase_bound_s(self, state: JobState, timeout_s: int) -> Optional[float]:
+        """
+        Maximum number of seconds a job with the given timeout is expected to stay in `state`.
+        Returns None if there is no bound for `state`.
+        """
+        factor = {
+            JobState.FUZZING: 1.0,
+            JobState.COVERAGE_TRACING: self.tracing_factor,
+            JobState.SYNCING_RESULTS: self.syncing_factor,
+        }.get(state, None)
+        if factor is None:
+            return None
+        return factor * timeout_s + self.grace_s
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How often and after which delay failed jobs are scheduled again.
+    """
+    # Total number of attempts per job, i.e., 1 disables retrying.
+    max_attempts: int = 1
+    # Delay before the first retry.
+    backoff_s: int = 5 * 60
+    # Factor the delay is multiplied with on each further retry.
+    backoff_factor: float = 2.0
+
+    def delay_s(self, failed_attempt: int) -> float:
+        return self.backoff_s * self.backoff_factor ** (failed_attempt - 1)
+
+@dataclass(frozen=True)
+class JobOptions:
+    """
+    Optional settings that alter how a `FuzzingJob` is executed.
+    """
+    # If set, the job is stopped as soon as its coverage plateaued.
+    adaptive_budget: Optional[AdaptiveBudget] = None
+    # Used to terminate jobs that exceed the expected duration of a phase.
+    watchdog: Watchdog = Watchdog()
+    # Whether coverage is traced and synced into the results directory after fuzzing.
+    collect_results: bool = True
+    # If set, the traces are added to this trace store instead of being synced as individual files.
+    trace_store: Optional[Path] = None
+    # Interval the fuzzers' throughput is sampled at while fuzzing.
+    stats_interval_s: int = 60
+
+@dataclass(frozen=True)
+class FuzzerStats:
+    """
+    Throughput of all AFL-style workers (AFL++, WEIZZ, and SYMCC's AFL++ workers)
+    of a job at a single point in time.
+    """
+    # Sum of the executions per second of all workers.
+    execs_per_sec: float
+    # Number of workers that reported stats.
+    workers: int
+    # Mean stability (in percent) of the workers reporting it, None if no worker did.
+    stability: Optional[float] = None
+    # Sum of the executions that timed out (or, for fuzzers not reporting them, of the saved hangs).
+    timeouts: int = 0
+    # Sum of the saved crashes.
+    crashes: int = 0
+
+    # CSV header of the time series written by each job.
+    SERIES_HEADER = 'elapsed_s;execs_per_sec;queue_size;stability;timeouts;crashes;workers'
+
+    @staticmethod
+    def first_of(stats: Dict[str, str], keys: List[str]) -> int:
+        """
+        Value of the first of `keys` found in `stats`. AFL++ and WEIZZ (based on AFL 2.52)
+        use different names for some values, e.g., saved_hangs and unique_hangs.
+        """
+        for key in keys:
+            if key in stats:
+                return int(stats[key])
+        return 0
+
+    def to_series_row(self, elapsed_s: int, queue_size: int) -> str:
+        stability = f'{self.stability:.2f}' if self.stability is not None else ''
+        return f'{elapsed_s};{self.execs_per_sec:.2f};{queue_size};{stability};{self.timeouts};{self.crashes};{self.workers}'
+
+    @staticmethod
+    def parse_stats_file(path: Path) -> Dict[str, str]:
+        """
+        Parse an AFL++ fuzzer_stats file consisting of `key : value` lines.
+        """
+        ret = {}
+        for line in path.read_text(errors='replace').splitlines():
+            key, sep, value = line.partition(':')
+            if sep:
+                ret[key.strip()] = value.strip()
+        return ret
+
+@dataclass(frozen=True)
+class CorpusOptions:
+    """
+    How the seeds of the targets are prepared before the campaign starts.
+    """
+    # Whether seeds with identical content are removed.
+    dedup: bool = True
+    # Whether the sink's seeds are reduced to a subset with the same coverage via afl-cmin.
+    minimize: bool = False
+    # Prepared corpora are stored here and reused by later campaigns.
+    cache_dir: Path = Path('~/.cache/fuzztruction-corpora').expanduser()
+    # afl-cmin executable used for minimization.
+    afl_cmin: str = 'afl-cmin'
+
+@dataclass(frozen=True)
+class CoverageOptions:
+    """
+    Settings of the coverage computation that runs alongside the campaign.
+    """
+    # Binary that computes the coverage.csv of all runs in the directory passed to it.
+    coverage_bin: Path = Path('~/fuzztruction/target/debug/coverage').expanduser()
+    # Number of cores that must not be allocated to fuzzing jobs before computing the coverage of a run.
+    min_cores: int = 4
+
+class InterferenceMatrix:
+    """
+    Slowdown targets experience when fuzzed concurrently with other targets,
+    as measured by `calibrate.py`.
+    """
+
+    def __init__(self, slowdowns: Dict[str, Dict[str, float]]):
+        self._slowdowns = slowdowns
+
+    @staticmethod
+    def from_path(path: Path) -> 'InterferenceMatrix':
+        data = yaml.load(Path(path).read_text(), yaml.Loader)
+        matrix = data['matrix']
+        return InterferenceMatrix({a: {b: float(v) for b, v in row.items()} for a, row in matrix.items()})
+
+    def slowdown(self, target: str, other: str) -> float:
+        """
+        Relative slowdown of `target` if it runs concurrently with `other`.
+        Unknown combinations are assumed to not interfere.
+        """
+        return self._slowdowns.get(target, {}).get(other, 0.0)
+
+    def conflicts(self, target: str, other: str, max_slowdown: float) -> bool:
+        return self.slowdown(target, other) > max_slowdown or self.slowdown(other, target) > max_slowdown
 
-@dataclass
+@dataclass(frozen=True)
 class CampaignConfig:
     timeout_s: int
     first_run_id: int
     last_run_id: int
-    fuzzers: List[Fuzzer]
+    fuzzers: Tuple[Fuzzer, ...]
     cores_total: int
     cores_per_target: int
     results_path: Path
-    targets: List[Target]
+    targets: Tuple[Target, ...]
+    adaptive_budget: Optional[AdaptiveBudget] = None
+    watchdog: Watchdog = Watchdog()
+    retry_policy: RetryPolicy = RetryPolicy()
+    # Whether the preflight executes each binary once.
+    preflight_smoke_run: bool = True
+    # If set, targets whose mutual slowdown exceeds `max_slowdown` are not run concurrently.
+    interference_matrix: Optional[InterferenceMatrix] = None
+    max_slowdown: float = 0.0
+    # If set, the jobs use seeds prepared by the `CorpusStage`.
+    corpus: Optional[CorpusOptions] = None
+    # If set, the coverage of each run is computed as soon as its traces were synced.
+    coverage: Optional[CoverageOptions] = None
+    # Whether the traces are stored in a trace store (see trace_store.py) inside `results_path`.
+    trace_store: bool = False
+    # Interval the fuzzers' throughput is sampled at.
+    stats_interval_s: int = 60
 
     @staticmethod
     def parse_timeout_as_seconds(timeout: str) -> int:
@@ -82,20 +377,99 @@ class CampaignConfig:
         return seconds
 
     @staticmethod
-    def parse_fuzzers(fuzzers: List[str]) -> List[Fuzzer]:
+    def parse_fuzzers(fuzzers: List[str]) -> Tuple[Fuzzer, ...]:
         ret = []
         for f in fuzzers:
             f = Fuzzer(f)
             ret.append(f)
-        return ret
+        return tuple(ret)
 
     @staticmethod
-    def parse_targets(targets: Dict[str, Dict[str, str]]) -> List[Target]:
+    def parse_targets(targets: Dict[str, Dict[str, str]]) -> Tuple[Target, ...]:
         ret = []
         for target, target_attrs in targets.items():
             config_path = Path(target_attrs['config']).expanduser().resolve()
-            ret.append(Target(target, config_path))
-        return ret
+            ret.append(Target.from_config(target, config_path))
+        return tuple(ret)
+
+    @staticmethod
+    def parse_adaptive_budget(attrs: Optional[Dict[str, str]]) -> Optional[AdaptiveBudget]:
+        if attrs is None:
+            return None
+        min_runtime_s = CampaignConfig.parse_timeout_as_seconds(attrs['min-runtime'])
+        window_s = CampaignConfig.parse_timeout_as_seconds(attrs['window'])
+        min_growth = float(attrs['min-growth'])
+        if min_growth < 0:
+            raise ValueError('min-growth must be >= 0')
+        poll_interval_s = CampaignConfig.parse_timeout_as_seconds(attrs.get('poll-interval', '1m'))
+        if poll_interval_s > window_s:
+            raise ValueError('poll-interval must be <= window')
+        return AdaptiveBudget(
+            min_runtime_s=min_runtime_s,
+            window_s=window_s,
+            min_growth=min_growth,
+            poll_interval_s=poll_interval_s,
+        )
+
+    @staticmethod
+    def parse_watchdog(attrs: Optional[Dict[str, str]]) -> Watchdog:
+        if attrs is None:
+            return Watchdog()
+        default = Watchdog()
+        grace_s = CampaignConfig.parse_timeout_as_seconds(attrs['grace']) if 'grace' in attrs else default.grace_s
+        tracing_factor = float(attrs.get('tracing-factor', default.tracing_factor))
+        syncing_factor = float(attrs.get('syncing-factor', default.syncing_factor))
+        kill_timeout_s = CampaignConfig.parse_timeout_as_seconds(attrs['kill-timeout']) if 'kill-timeout' in attrs else default.kill_timeout_s
+        if tracing_factor <= 0 or syncing_factor <= 0:
+            raise ValueError('Watchdog factors must be > 0')
+        return Watchdog(
+            grace_s=grace_s,
+            tracing_factor=tracing_factor,
+            syncing_factor=syncing_factor,
+            kill_timeout_s=kill_timeout_s,
+        )
+
+    @staticmethod
+    def parse_retry_policy(attrs: Optional[Dict[str, str]]) -> RetryPolicy:
+        if attrs is None:
+            return RetryPolicy()
+        default = RetryPolicy()
+        max_attempts = int(attrs.get('max-attempts', default.max_attempts))
+        if max_attempts < 1:
+            raise ValueError('max-attempts must be >= 1')
+        backoff_s = CampaignConfig.parse_timeout_as_seconds(attrs['backoff']) if 'backoff' in attrs else default.backoff_s
+        backoff_factor = float(attrs.get('backoff-factor', default.backoff_factor))
+        if backoff_factor < 1:
+            raise ValueError('backoff-factor must be >= 1')
+        return RetryPolicy(
+            max_attempts=max_attempts,
+            backoff_s=backoff_s,
+            backoff_factor=backoff_factor,
+        )
+
+    @staticmethod
+    def parse_corpus(attrs: Optional[Dict[str, Any]]) -> Optional[CorpusOptions]:
+        if attrs is None:
+            return None
+        default = CorpusOptions()
+        cache_dir = Path(attrs['cache-dir']).expanduser().resolve() if 'cache-dir' in attrs else default.cache_dir
+        return CorpusOptions(
+            dedup=bool(attrs.get('dedup', default.dedup)),
+            minimize=bool(attrs.get('minimize', default.minimize)),
+            cache_dir=cache_dir,
+            afl_cmin=str(attrs.get('afl-cmin', default.afl_cmin)),
+        )
+
+    @staticmethod
+    def parse_coverage(attrs: Optional[Dict[str, Any]]) -> Optional[CoverageOptions]:
+        if attrs is None or not attrs.get('incremental', False):
+            return None
+        default = CoverageOptions()
+        coverage_bin = Path(attrs['bin']).expanduser().resolve() if 'bin' in attrs else default.coverage_bin
+        min_cores = int(attrs.get('min-cores', default.min_cores))
+        if min_cores < 1:
+            raise ValueError('min-cores must be >= 1')
+        return CoverageOptions(coverage_bin=coverage_bin, min_cores=min_cores)
 
     @staticmethod
     def from_path(path: Path) -> 'CampaignConfig':
@@ -118,6 +492,20 @@ class CampaignConfig:
             raise ValueError('cores_per_target must be >= 2')
         results_path = Path(config['results-path']).expanduser().resolve()
         targets = CampaignConfig.parse_targets(config['targets'])
+        adaptive_budget = CampaignConfig.parse_adaptive_budget(config.get('adaptive-budget'))
+        watchdog = CampaignConfig.parse_watchdog(config.get('watchdog'))
+        retry_policy = CampaignConfig.parse_retry_policy(config.get('retry'))
+        preflight_smoke_run = bool((config.get('preflight') or {}).get('smoke-run', True))
+        interference = config.get('interference')
+        interference_matrix = None
+        max_slowdown = 0.0
+        if interference is not None:
+            interference_matrix = InterferenceMatrix.from_path(Path(interference['matrix']).expanduser())
+            max_slowdown = float(interference['max-slowdown'])
+        corpus = CampaignConfig.parse_corpus(config.get('corpus'))
+        coverage = CampaignConfig.parse_coverage(config.get('coverage'))
+        trace_store = bool(config.get('trace-store', False))
+        stats_interval_s = CampaignConfig.parse_timeout_as_seconds(config.get('stats-interval', '1m'))
 
         ret = CampaignConfig(
             timeout_s=timeout_s,
@@ -128,35 +516,458 @@ class CampaignConfig:
             cores_per_target=cores_per_target,
             results_path=results_path,
             targets=targets,
+            adaptive_budget=adaptive_budget,
+            watchdog=watchdog,
+            retry_policy=retry_policy,
+            preflight_smoke_run=preflight_smoke_run,
+            interference_matrix=interference_matrix,
+            max_slowdown=max_slowdown,
+            corpus=corpus,
+            coverage=coverage,
+            trace_store=trace_store,
+            stats_interval_s=stats_interval_s,
         )
         return ret
 
+    def trace_store_path(self) -> Optional[Path]:
+        return self.results_path / TRACE_STORE_DIR if self.trace_store else None
+
+    def job_options(self) -> JobOptions:
+        return JobOptions(adaptive_budget=self.adaptive_budget, watchdog=self.watchdog,
+                          trace_store=self.trace_store_path(), stats_interval_s=self.stats_interval_s)
+
+class PreflightError(Exception):
+    pass
+
+class Preflight:
+    """
+    Checks that all binaries and seed directories needed by the campaign exist and
+    that each binary can be executed, before any job is started.
+    """
+
+    # Time a binary may run during the smoke run. Binaries that are still running
+    # afterwards (e.g., because they wait for input) are considered to be working.
+    SMOKE_RUN_TIMEOUT_S = 10
+
+    def __init__(self, config: CampaignConfig, log: logging.LoggerAdapter):
+        self._config = config
+        self.log = log
+        self._smoke_run = config.preflight_smoke_run
+
+    def required_binaries(self, target: Target) -> List[Binary]:
+        """
+        The binaries of `target` that are used by the fuzzers of the campaign.
+        """
+        roles = {'sink', 'vanilla'}
+        if Fuzzer.FUZZTRUCTION in self._config.fuzzers or Fuzzer.FUZZTRUCTION_NO_AFL in self._config.fuzzers:
+            roles.add('source')
+        if Fuzzer.SYMCC in self._config.fuzzers and target.name not in SYMCC_UNSUPPORTED_TARGETS:
+            roles.update(['symcc', 'symcc.afl-bin'])
+        ret = [b for b in target.binaries if b.role in roles]
+        if len(ret) != len(roles):
+            missing = roles - {b.role for b in ret}
+            raise PreflightError(f'{target.name}: Target config lacks binaries for {", ".join(sorted(missing))}')
+        return ret
+
+    def required_input_dirs(self, target: Target) -> List[Path]:
+        """
+        The seed directories of `target` that are used by the fuzzers of the campaign.
+        """
+        ret = []
+        fuzzers = set(self._config.fuzzers)
+        if fuzzers & {Fuzzer.FUZZTRUCTION, Fuzzer.FUZZTRUCTION_NO_AFL}:
+            ret.append(target.ft_input_dir)
+        if fuzzers - {Fuzzer.FUZZTRUCTION_NO_AFL}:
+            if target.other_input_dir is None:
+                raise PreflightError(f'{target.name}: Target config {target.config} lacks attribute afl++.input-dir')
+            ret.append(target.other_input_dir)
+        return ret
+
+    @staticmethod
+    def check_input_dir(path: Path) -> Optional[str]:
+        if not path.is_dir():
+            return f'Input directory {path} does not exist'
+        if not any(path.iterdir()):
+            return f'Input directory {path} is empty'
+        return None
+
+    def check_binary(self, binary: Binary) -> Optional[str]:
+        if not binary.path.is_file():
+            return f'{binary.role} binary {binary.path} does not exist'
+        if not os.access(binary.path, os.X_OK):
+            return f'{binary.role} binary {binary.path} is not executable'
+        if not self._smoke_run:
+            return None
+
+        env = dict(os.environ)
+        env.update(dict(binary.env))
+        with tempfile.TemporaryDirectory(prefix='ft-preflight-') as cwd:
+            env['SYMCC_OUTPUT_DIR'] = cwd
+            try:
+                process = subprocess.run(
+                    [binary.path.as_posix()], cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=Preflight.SMOKE_RUN_TIMEOUT_S)
+            except subprocess.TimeoutExpired:
+                return None
+            except OSError as e:
+                return f'{binary.role} binary {binary.path} failed to execute: {e}'
+
+        output = process.stdout.decode(errors='replace')
+        load_errors = ['error while loading shared libraries', 'cannot be preloaded']
+        if any(e in output for e in load_errors) or process.returncode in [126, 127]:
+            return f'{binary.role} binary {binary.path} failed to start: {output.strip()[-500:]}'
+        if process.returncode < 0:
+            return f'{binary.role} binary {binary.path} was terminated by signal {-process.returncode}'
+        return None
+
+    def run(self):
+        """
+        Run all checks in parallel. Raises a PreflightError listing all problems found.
+        """
+        start_ts = time.monotonic()
+        problems = []
+        binaries: Dict[Binary, List[str]] = {}
+        input_dirs: Dict[Path, List[str]] = {}
+        for target in self._config.targets:
+            try:
+                for binary in self.required_binaries(target):
+                    binaries.setdefault(binary, []).append(target.name)
+                for input_dir in self.required_input_dirs(target):
+                    input_dirs.setdefault(input_dir, []).append(target.name)
+            except PreflightError as e:
+                problems.append(str(e))
+        coverage = self._config.coverage
+        if coverage is not None and not os.access(coverage.coverage_bin, os.X_OK):
+            problems.append(f'Coverage binary {coverage.coverage_bin} does not exist or is not executable')
+
+        # Binaries shared by multiple targets (e.g., openssl) are only checked once.
+        with ThreadPoolExecutor(max_workers=self._config.cores_total) as executor:
+            binary_results = executor.map(self.check_binary, binaries.keys())
+            input_dir_results = executor.map(Preflight.check_input_dir, input_dirs.keys())
+            for targets, problem in zip(list(binaries.values()) + list(input_dirs.values()), list(binary_results) + list(input_dir_results)):
+                if problem is not None:
+                    problems.append(f'{", ".join(targets)}: {problem}')
+
+        self.log.info(f'Preflight checked {len(binaries)} binaries and {len(input_dirs)} input directories in {time.monotonic() - start_ts:.1f}s')
+        if problems:
+            raise PreflightError('Preflight failed:\n' + '\n'.join(problems))
+
+class CorpusError(Exception):
+    pass
+
+class CorpusStage:
+    """
+    Prepares the seeds of all targets before the campaign starts. Seeds with identical
+    content are removed and, if configured, the sink's seeds are minimized via afl-cmin.
+    The prepared corpora are cached by the hashes of the seeds (and of the sink binary),
+    such that later campaigns reuse them.
+    """
+
+    # Written last into each prepared corpus, thus its presence marks the corpus as complete.
+    INFO_FILE = 'corpus.yml'
+    # Timeout in ms of each execution of the sink during minimization.
+    CMIN_TIMEOUT_MS = 5000
+
+    def __init__(self, config: CampaignConfig, log_dir: Path, log: logging.LoggerAdapter):
+        assert config.corpus is not None
+        self._config = config
+        self._options = config.corpus
+        self._log_dir = log_dir
+        self.log = log
+
+    @staticmethod
+    def hash_file(path: Path) -> str:
+        h = hashlib.sha256()
+        with path.open('rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    @staticmethod
+    def collect_seeds(input_dir: Path) -> List[Path]:
+        return sorted(p for p in input_dir.rglob('*') if p.is_file())
+
+    def _minimizer_identity(self, sink: Binary) -> Dict[str, Any]:
+        afl_cmin = shutil.which(self._options.afl_cmin)
+        if afl_cmin is None:
+            raise CorpusError(f'{self._options.afl_cmin} not found, but it is needed to minimize the corpora')
+        return {
+            'afl-cmin': CorpusStage.hash_file(Path(afl_cmin)),
+            'binary': CorpusStage.hash_file(sink.path),
+            'args': list(sink.args),
+            'env': [list(e) for e in sink.env],
+        }
+
+    def _minimize(self, target: Target, sink: Binary, input_dir: Path, output_dir: Path):
+        cmd = [
+            self._options.afl_cmin,
+            '-i', input_dir.as_posix(),
+            '-o', output_dir.as_posix(),
+            '-t', str(CorpusStage.CMIN_TIMEOUT_MS),
+            '-T', str(self._config.cores_total),
+            '--', sink.path.as_posix(), *sink.args,
+        ]
+        env = dict(os.environ)
+        env.update(dict(sink.env))
+        log_path = self._log_dir / f'corpus-{target.name}-cmin.log'
+        self.log.info(f'{target.name}: Minimizing corpus: {" ".join(cmd)}')
+        with log_path.open('w') as log_file:
+            process = subprocess.run(cmd, env=env, stdin=subprocess.DEVNULL, stdout=log_file, stderr=subprocess.STDOUT)
+        if process.returncode != 0 or Preflight.check_input_dir(output_dir) is not None:
+            raise CorpusError(f'{target.name}: Minimizing the corpus via afl-cmin failed (see {log_path})')
+
+    def prepare(self, target: Target, input_dir: Path, executor: ThreadPoolExecutor, sink: Optional[Binary]) -> Path:
+        """
+        Return the directory containing the prepared seeds of `input_dir`. If `sink` is
+        given, the seeds are minimized w.r.t. the coverage they achieve in `sink`.
+        """
+        start_ts = time.monotonic()
+        seeds = CorpusStage.collect_seeds(input_dir)
+        digests = list(executor.map(CorpusStage.hash_file, seeds))
+
+        key_data = {
+            'seeds': sorted(set(digests)) if self._options.dedup else sorted(digests),
+            'dedup': self._options.dedup,
+            'minimizer': self._minimizer_identity(sink) if sink is not None else None,
+        }
+        key = hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+        corpus_dir = self._options.cache_dir / f'{target.name}-{input_dir.name}-{key[:16]}'
+        if (corpus_dir / CorpusStage.INFO_FILE).is_file():
+            self.log.info(f'{target.name}: Using cached corpus {corpus_dir} for {input_dir}')
+            return corpus_dir / 'seeds'
+
+        self._options.cache_dir.mkdir(parents=True, exist_ok=True)
+        # The corpus is assembled in a temporary directory and moved into place once complete.
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f'{corpus_dir.name}-', dir=self._options.cache_dir))
+        try:
+            unique_dir = tmp_dir / 'unique'
+            unique_dir.mkdir()
+            seen = set()
+            names = set()
+            for idx, (seed, digest) in enumerate(zip(seeds, digests)):
+                if self._options.dedup and digest in seen:
+                    continue
+                seen.add(digest)
+                # Seeds from different subdirectories might share a name.
+                name = seed.name if seed.name not in names else f'{seed.name}-{idx}'
+                names.add(name)
+                shutil.copy2(seed, unique_dir / name)
+
+            if sink is not None:
+                self._minimize(target, sink, unique_dir, tmp_dir / 'seeds')
+                shutil.rmtree(unique_dir)
+            else:
+                unique_dir.rename(tmp_dir / 'seeds')
+
+            prepared = len(list((tmp_dir / 'seeds').iterdir()))
+            info = {
+                'target': target.name,
+                'input-dir': input_dir.as_posix(),
+                'seeds': len(seeds),
+                'unique': len(names),
+                'prepared': prepared,
+                'minimized': sink is not None,
+            }
+            (tmp_dir / CorpusStage.INFO_FILE).write_text(yaml.dump(info, sort_keys=False))
+            try:
+                tmp_dir.rename(corpus_dir)
+            except OSError:
+                # Prepared concurrently by another campaign.
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        self.log.info(f'{target.name}: Prepared {input_dir}: {len(seeds)} seeds, {len(names)} unique, '
+                      f'{prepared} used ({time.monotonic() - start_ts:.1f}s)')
+        return corpus_dir / 'seeds'
+
+    @staticmethod
+    def write_config(target: Target, ft_input_dir: Path, other_input_dir: Optional[Path]) -> Path:
+        """
+        Write a copy of the target's config that uses the given input directories. The copy
+        is placed next to the original, such that relative paths stay valid.
+        """
+        cfg = yaml.load(target.config.read_text(), yaml.Loader)
+        cfg['input-directory'] = ft_input_dir.as_posix()
+        if other_input_dir is not None:
+            cfg['afl++']['input-dir'] = other_input_dir.as_posix()
+        path = target.config.with_name(f'.{target.config.stem}.corpus.yml')
+        path.write_text(yaml.dump(cfg, sort_keys=False))
+        return path
+
+    def prepare_target(self, target: Target, executor: ThreadPoolExecutor) -> Target:
+        required = Preflight(self._config, self.log).required_input_dirs(target)
+        ft_input_dir = target.ft_input_dir
+        other_input_dir = target.other_input_dir
+        if ft_input_dir in required:
+            ft_input_dir = self.prepare(target, target.ft_input_dir, executor, None)
+        if other_input_dir in required:
+            sink = target.binary('sink') if self._options.minimize else None
+            other_input_dir = self.prepare(target, target.other_input_dir, executor, sink)
+        config = CorpusStage.write_config(target, ft_input_dir, other_input_dir)
+        return replace(target, config=config, ft_input_dir=ft_input_dir, other_input_dir=other_input_dir)
+
+    def run(self) -> CampaignConfig:
+        """
+        Prepare the corpora of all targets and return a config whose targets use them.
+        Raises a CorpusError if a corpus could not be prepared.
+        """
+        start_ts = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self._config.cores_total) as executor:
+            targets = tuple(self.prepare_target(t, executor) for t in self._config.targets)
+        self.log.info(f'Prepared the corpora of {len(targets)} targets in {time.monotonic() - start_ts:.1f}s')
+        return replace(self._config, targets=targets)
+
+def kill_process_tree(process: subprocess.Popen, log: logging.LoggerAdapter, timeout_s: float):
+    """
+    Terminate `process` and all of its descendants. All processes receive SIGTERM first,
+    processes still alive after `timeout_s` seconds are killed via SIGKILL.
+    Since our children are started via sudo, the signals are sent via sudo as well.
+    Processes reparented after `process` exited are found via its process group, thus
+    `process` needs to be started with `start_new_session=True`.
+    This never raises if a process refuses to exit.
+    """
+    def collect_tree() -> List[psutil.Process]:
+        procs = []
+        # The pid might have been reused once the root process was reaped.
+        if process.poll() is None:
+            try:
+                root = psutil.Process(process.pid)
+                procs = [root] + root.children(recursive=True)
+            except psutil.NoSuchProcess:
+                pass
+        for proc in psutil.process_iter():
+            try:
+                if proc not in procs and os.getpgid(proc.pid) == process.pid:
+                    procs.append(proc)
+            except (psutil.NoSuchProcess, ProcessLookupError):
+                pass
+        return procs
+
+    def alive(procs: List[psutil.Process]) -> List[psutil.Process]:
+        ret = []
+        for proc in procs:
+            try:
+                if proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE:
+                    ret.append(proc)
+            except psutil.NoSuchProcess:
+                pass
+        return ret
+
+    def signal_all(signal: str, procs: List[psutil.Process]):
+        pids = [str(proc.pid) for proc in procs]
+        if pids:
+            subprocess.call(['sudo', 'kill', f'-{signal}', *pids], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    procs = alive(collect_tree())
+    if not procs:
+        return
+    signal_all('TERM', procs)
+    deadline = time.monotonic() + timeout_s
+    while alive(procs) and time.monotonic() < deadline:
+        process.poll()
+        time.sleep(0.5)
+
+    # Processes spawned in the meantime are killed as well.
+    survivors = alive(procs + collect_tree())
+    if survivors:
+        log.warning(f'{len(survivors)} processes of {process.pid} survived SIGTERM, sending SIGKILL')
+        signal_all('KILL', survivors)
+
+    try:
+        process.wait(timeout_s)
+    except subprocess.TimeoutExpired:
+        log.error(f'Process {process.pid} did not exit after SIGKILL')
+
+class PlateauDetector:
+    """
+    Tracks samples of a monotonic coverage signal (e.g., the queue size) and
+    decides whether it stopped growing according to an `AdaptiveBudget`.
+    """
+
+    def __init__(self, budget: AdaptiveBudget):
+        self._budget = budget
+        self._samples: Deque[Tuple[float, int]] = deque()
+
+    def add_sample(self, ts: float, value: int):
+        self._samples.append((ts, value))
+        # Drop samples that are not needed anymore to span the window.
+        while len(self._samples) > 2 and ts - self._samples[1][0] >= self._budget.window_s:
+            self._samples.popleft()
+
+    def plateau_reached(self, elapsed_s: float) -> bool:
+        if elapsed_s < self._budget.min_runtime_s or len(self._samples) < 2:
+            return False
+        oldest_ts, oldest = self._samples[0]
+        newest_ts, newest = self._samples[-1]
+        if newest_ts - oldest_ts < self._budget.window_s:
+            return False
+        if oldest == 0:
+            # No signal yet (e.g., the fuzzer is still calibrating).
+            return False
+        growth = (newest - oldest) / oldest
+        return growth < self._budget.min_growth
+
 class FuzzingJob:
 
-    def __init__(self, target: Target, run_id: int, timeout_s: int, cores: int, fuzzer: Fuzzer, log_dir: Path, results_dir: Path):
+    def __init__(self, target: Target, run_id: int, timeout_s: int, cores: int, fuzzer: Fuzzer, log_dir: Path, results_dir: Path, options: JobOptions = JobOptions()):
         self._target = target
         self._run_id = run_id
         self._timeout_s = timeout_s
         # Needed if two fuzzers are running together (e.g., FT + AFL)
         assert cores >= 2
         self._cores = cores
-        self._state = JobState.READY
-        self._start_ts = None
         self._fuzzer = fuzzer
-        self._exit_requested = False
-        self._worker: Thread = None
         self._log_dir = log_dir
         self._results_dir = results_dir
+        self._options = options
+        self._attempt = 1
+        self._init_state()
         self.log = self._setup_logger()
 
+    def _init_state(self):
+        """
+        Initialize everything that is specific to a single attempt of executing the job.
+        """
+        self._state = JobState.READY
+        self._state_ts = time.monotonic()
+        self._declared_dead = False
+        self._start_ts = None
+        self._exit_requested = False
+        self._worker: Thread = None
+        self._subprocesses: List[subprocess.Popen[bytes]] = []
+        self._plateau_detector: Optional[PlateauDetector] = None
+        if self._options.adaptive_budget is not None:
+            self._plateau_detector = PlateauDetector(self._options.adaptive_budget)
+        self._last_plateau_poll_ts = 0.0
+        self._fuzzing_s: Optional[int] = None
+        self._stopped_early = False
+        # Rows of the throughput time series (see FuzzerStats.SERIES_HEADER).
+        self._stats_series: List[str] = []
+        self._last_stats_ts = 0.0
+
     def _setup_logger(self):
-        log_path = self._log_dir / f'{self.name()}-scheduler.log'
         logger = logging.getLogger(self.name())
-        file_handler = logging.FileHandler(log_path)
-        logger.addHandler(file_handler)
         logger = logging.LoggerAdapter(logger, {'job_name': self.name()})
         return logger
 
+    def _log_path(self, kind: str) -> Path:
+        """
+        Path of the log file of the given kind (e.g., tracing) for the current attempt.
+        """
+        if self._attempt == 1:
+            return self._log_dir / f'{self.name()}-{kind}.log'
+        return self._log_dir / f'{self.name()}-attempt{self._attempt}-{kind}.log'
+
+    def _open_job_log(self):
+        if _log_writer is not None:
+            _log_writer.open_job_log(self.name(), self._log_path('scheduler'))
+
+    def _close_job_log(self):
+        if _log_writer is not None:
+            _log_writer.close_job_log(self.name())
+
     def cores(self) -> int:
         """
         Number of cores required by this job.
@@ -169,18 +980,75 @@ class FuzzingJob:
         """
         return self._state
 
+    def _set_state(self, state: JobState):
+        if self._declared_dead:
+            # The watchdog already gave up on this job, thus the worker must not revive it.
+            return
+        self._state = state
+        self._state_ts = time.monotonic()
+
+    def attempt(self) -> int:
+        """
+        The number of the attempt this job represents, starting at 1.
+        """
+        return self._attempt
+
+    def is_alive(self) -> bool:
+        """
+        Whether the worker thread of this job is still running.
+        """
+        return self._worker is not None and self._worker.is_alive()
+
+    def retry(self) -> 'FuzzingJob':
+        """
+        Create a new job that represents the next attempt of executing this job.
+        """
+        job = copy.copy(self)
+        job._attempt = self._attempt + 1
+        job._init_state()
+        return job
+
+    def phase_overdue(self) -> bool:
+        """
+        Whether the job stays in its current phase for longer than the watchdog allows.
+        """
+        bound_s = self._options.watchdog.phase_bound_s(self._state, self._timeout_s)
+        if bound_s is None:
+            return False
+        return time.monotonic() - self._state_ts > bound_s
+
+    def declare_dead(self):
+        """
+        Mark the job as FAILED right away, such that its cores can be reclaimed, and
+        kill all its processes in the background. The worker thread exits as soon as it
+        notices that its processes are gone.
+        """
+        self.log.error(f'Declaring job dead while in state {self._state}')
+        self._set_state(JobState.FAILED)
+        self._declared_dead = True
+        self._exit_requested = True
+        Thread(target=self._terminate, name=f'{self.name()}-terminate').start()
+
     def start(self):
         """
         Start the fuzzing job. After calling this, the jobs state
         is different to JobState.READY.
         """
-        self.log.info('Starting fuzzing job')
+        self._open_job_log()
+        self.log.info(f'Starting fuzzing job (attempt {self._attempt})')
         assert self._state == JobState.READY
-        self._state = JobState.FUZZING
+        self._set_state(JobState.FUZZING)
         self._start_ts = time.monotonic()
-        self._worker = Thread(target=self._loop)
+        self._worker = Thread(target=self._run)
         self._worker.start()
 
+    def _run(self):
+        try:
+            self._loop()
+        finally:
+            self.log.info(f'Worker exited with state {self._state}')
+            self._close_job_log()
+
     def request_exit(self):
         """
         Request to terminate the worker, instead of waiting for the job to be finished.
@@ -194,7 +1062,7 @@ class FuzzingJob:
         Trace the coverage for all found inputs are store it into the jobs workdir.
         """
         self.log.info('Starting tracing')
-        self._state = JobState.COVERAGE_TRACING
+        self._set_state(JobState.COVERAGE_TRACING)
 
         tracing_cmd = [
             '/usr/bin/sudo',
@@ -206,17 +1074,25 @@ class FuzzingJob:
             '-j', str(self.cores())
         ]
         self.log.info(f'Tracing command: {" ".join(tracing_cmd)}')
-        log_path = self._log_dir / f'{self.fuzzer_workdir().name}-tracing.log'
-        tracing_process = subprocess.Popen(tracing_cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT)
+        log_path = self._log_path('tracing')
+        tracing_process = subprocess.Popen(tracing_cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT, start_new_session=True)
+        self._subprocesses.append(tracing_process)
+        self._wait_for(tracing_process, check=False)
+        self.log.info('Tracing finished')
 
-        while tracing_process.poll() is None:
+    def _wait_for(self, process: subprocess.Popen, check: bool = True):
+        """
+        Wait for `process` to terminate. Raises InterruptedError if the job is requested
+        to exit in the meantime and, if `check` is set, CalledProcessError if the process failed.
+        """
+        while process.poll() is None:
             if self.exit_requested():
-                pid = tracing_process.pid
-                subprocess.call(f'sudo kill {pid}', shell=True)
-                tracing_process.wait(60)
-                self._state = JobState.EXIT_REQUESTED
+                kill_process_tree(process, self.log, self._options.watchdog.kill_timeout_s)
+                self._set_state(JobState.EXIT_REQUESTED)
                 raise InterruptedError('Exit requested')
-        self.log.info('Tracing finished')
+            time.sleep(1)
+        if check and process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, process.args)
 
     def _sync_results(self):
         """
@@ -226,13 +1102,152 @@ class FuzzingJob:
         src = self.fuzzer_workdir()
         dst = self._results_dir
         self.log.info(f'Syncing {src} to {dst}')
-        log_path = self._log_dir / f'{self.fuzzer_workdir().name}-syncing.log'
-        cmd = f"sudo rsync -arv --include='/*' --include='traces/' --include='traces/**' --exclude='*' --prune-empty-dirs {src.as_posix()} {dst.as_posix()}"
+        self._set_state(JobState.SYNCING_RESULTS)
+        log_path = self._log_path('syncing')
+        if self._options.trace_store is not None:
+            self._store_traces(log_path)
+            return
+        # --delete removes stale traces left by a previous, failed attempt.
+        cmd = f"sudo rsync -arv --delete --include='/*' --include='traces/' --include='traces/**' --exclude='*' --prune-empty-dirs {src.as_posix()} {dst.as_posix()}"
         self.log.info(f'Sync cmd: {cmd}')
-        subprocess.check_call(cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT, shell=True)
+        process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT, shell=True, start_new_session=True)
+        self._subprocesses.append(process)
+        self._wait_for(process)
         #shutil.rmtree(src, ignore_errors=True)
         self.log.info('Syncing finshed')
 
+    def _store_traces(self, log_path: Path):
+        """
+        Add the traces of the job to the trace store. Only the run's directory (holding files
+        such as run_info.csv) is created in the results directory.
+        """
+        subprocess.run(['sudo', 'mkdir', '-p', (self._results_dir / self.name()).as_posix()], check=True)
+        cmd = [
+            'sudo', sys.executable, TRACE_STORE_SCRIPT.as_posix(),
+            'add', self._options.trace_store.as_posix(), self.name(), (self.fuzzer_workdir() / 'traces').as_posix(),
+        ]
+        self.log.info(f'Trace store cmd: {" ".join(cmd)}')
+        process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT, start_new_session=True)
+        self._subprocesses.append(process)
+        self._wait_for(process)
+        self.log.info('Storing traces finished')
+
+    def _write_result_file(self, name: str, content: str):
+        """
+        Write `content` into the file `name` inside the job's results directory.
+        The results directory is populated by `sudo rsync`, thus we need to write as root.
+        """
+        path = self._results_dir / self.name() / name
+        self.log.info(f'Writing {path}')
+        # rsync prunes the run's directory if the job produced no traces.
+        subprocess.run(['sudo', 'mkdir', '-p', path.parent.as_posix()], check=True)
+        subprocess.run(['sudo', 'tee', path.as_posix()], input=content.encode(), stdout=subprocess.DEVNULL, check=True)
+
+    def _write_run_info(self):
+        """
+        Record how long the job actually fuzzed, such that runs stopped
+        early by the adaptive budget can be accounted for while plotting.
+        """
+        content = 'fuzzing_s;budget_s;stopped_early\n'
+        content += f'{self._fuzzing_s};{self._timeout_s};{int(self._stopped_early)}\n'
+        self._write_result_file('run_info.csv', content)
+
+    def queue_size(self) -> int:
+        """
+        Number of entries in all queues found in the job's workdir. This is used as
+        cheap signal for the coverage achieved so far.
+        NOTE: This depends on the workdir layout of Fuzztruction and AFL++.
+        """
+        workdir = self.fuzzer_workdir()
+        size = 0
+        for pattern in ['queue', '*/queue', '*/*/queue']:
+            for queue_dir in workdir.glob(pattern):
+                try:
+                    with os.scandir(queue_dir) as entries:
+                        size += sum(1 for e in entries if e.is_file())
+                except OSError:
+                    pass
+        return size
+
+    def fuzzer_stats(self) -> FuzzerStats:
+        """
+        Aggregate the fuzzer_stats files of all AFL-style workers in the job's workdir.
+        Fuzztruction's own workers do not write such files, thus only the queue size
+        reflects their progress.
+        """
+        workdir = self.fuzzer_workdir()
+        execs_per_sec = 0.0
+        workers = 0
+        stabilities = []
+        timeouts = 0
+        crashes = 0
+        for pattern in ['*/fuzzer_stats', '*/*/fuzzer_stats']:
+            for stats_file in workdir.glob(pattern):
+                try:
+                    stats = FuzzerStats.parse_stats_file(stats_file)
+                    worker_execs_per_sec = float(stats.get('execs_per_sec', 0))
+                    worker_timeouts = FuzzerStats.first_of(stats, ['total_tmout', 'saved_hangs', 'unique_hangs'])
+                    worker_crashes = FuzzerStats.first_of(stats, ['saved_crashes', 'unique_crashes'])
+                    stability = float(stats['stability'].rstrip('%')) if 'stability' in stats else None
+                except (OSError, ValueError):
+                    continue
+                execs_per_sec += worker_execs_per_sec
+                timeouts += worker_timeouts
+                crashes += worker_crashes
+                if stability is not None:
+                    stabilities.append(stability)
+                workers += 1
+        return FuzzerStats(
+            execs_per_sec=execs_per_sec,
+            workers=workers,
+            stability=sum(stabilities) / len(stabilities) if stabilities else None,
+            timeouts=timeouts,
+            crashes=crashes,
+        )
+
+    def _sample_stats(self, force: bool = False):
+        """
+        Record the throughput of the job's fuzzers, if the stats interval elapsed since the last sample.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_stats_ts < self._options.stats_interval_s:
+            return
+        self._last_stats_ts = now
+        elapsed_s = int(now - self._start_ts)
+        self._stats_series.append(self.fuzzer_stats().to_series_row(elapsed_s, self.queue_size()))
+
+    def _write_stats_series(self):
+        """
+        Store the sampled throughput, such that it can be compared across campaigns.
+        """
+        content = FuzzerStats.SERIES_HEADER + '\n'
+        content += ''.join(f'{row}\n' for row in self._stats_series)
+        self._write_result_file('fuzzer_stats.csv', content)
+
+    def target(self) -> Target:
+        return self._target
+
+    def plateau_reached(self) -> bool:
+        """
+        Sample the coverage signal and check whether the adaptive budget allows stopping the job.
+        Always returns False if the job is not configured to use an adaptive budget.
+        """
+        if self._plateau_detector is None:
+            return False
+        now = time.monotonic()
+        budget = self._options.adaptive_budget
+        if now - self._last_plateau_poll_ts < budget.poll_interval_s:
+            return False
+        self._last_plateau_poll_ts = now
+
+        queue_size = self.queue_size()
+        self._plateau_detector.add_sample(now, queue_size)
+        elapsed_s = now - self._start_ts
+        if self._plateau_detector.plateau_reached(elapsed_s):
+            self.log.info(f'Coverage plateaued after {int(elapsed_s)}s (queue size: {queue_size})')
+            return True
+        return False
+
     def exit_requested(self):
         return self._exit_requested
 
@@ -267,21 +1282,22 @@ class FuzzingJob:
             self._worker.join()
 
     def __str__(self):
-        ret = f'{self.__class__.__name__}(fuzzer={self._fuzzer}, target={self._target}, run_id={self._run_id})'
+        ret = f'{self.__class__.__name__}(fuzzer={self._fuzzer}, target={self._target}, run_id={self._run_id}, attempt={self._attempt})'
         return ret
 
     def _loop(self) -> None:
         raise NotImplementedError()
 
     def _terminate(self) -> None:
-        raise NotImplementedError()
+        """
+        Terminate all processes spawned by this job, including their children.
+        """
+        self.log.info(f'Terminating worker')
+        for process in self._subprocesses:
+            kill_process_tree(process, self.log, self._options.watchdog.kill_timeout_s)
 
 class AflPlusPlusJob(FuzzingJob):
 
-    def __init__(self, target: Target, run_id: int, timeout_s: int, cores: int, fuzzer: Fuzzer, log_dir: Path, results_dir: Path):
-        super().__init__(target, run_id, timeout_s, cores, fuzzer, log_dir, results_dir)
-        self._subprocesses: List[subprocess.Popen[bytes]] = []
-
     def _spawn_other_fuzzing_process(self) -> int:
         return self.cores()
 
@@ -302,8 +1318,8 @@ class AflPlusPlusJob(FuzzingJob):
                 '-j', str(cores_left)
             ]
             self.log.info(f'AFL++ command: {" ".join(afl_cmd)}')
-            log_path = self._log_dir / f'{self.fuzzer_workdir().name}-aflworker.log'
-            process = subprocess.Popen(afl_cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT)
+            log_path = self._log_path('aflworker')
+            process = subprocess.Popen(afl_cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT, start_new_session=True)
             self._subprocesses.append(process)
 
         try:
@@ -311,41 +1327,44 @@ class AflPlusPlusJob(FuzzingJob):
                 time.sleep(1)
                 if all(map(lambda e: e.poll() != None, self._subprocesses)):
                     # All are terminated
-                    self._run_tracing()
-                    self._sync_results()
+                    self._fuzzing_s = int(time.monotonic() - self._start_ts)
+                    # The stats files outlive the fuzzers, thus this records their final state.
+                    self._sample_stats(force=True)
+                    if self._options.collect_results:
+                        self._run_tracing()
+                        self._sync_results()
+                        self._write_run_info()
+                        self._write_stats_series()
                     break
+                self._sample_stats()
+                if not self._stopped_early and self.plateau_reached():
+                    self.log.info('Stopping fuzzing early because of the adaptive budget')
+                    self._stopped_early = True
+                    self._terminate()
         except InterruptedError:
             self.log.warning(f'Interrupted while executing worker')
             self._terminate()
         except Exception as _:
             self.log.warning(f'Error while executing worker', exc_info=True)
-            self._state = JobState.FAILED
+            self._set_state(JobState.FAILED)
             self._terminate()
         else:
-            self.log.info('Job finished')
-            self._state = JobState.FINISHED
+            if self.exit_requested():
+                self._set_state(JobState.EXIT_REQUESTED)
+            else:
+                self.log.info('Job finished')
+                self._set_state(JobState.FINISHED)
 
         if self.exit_requested():
             # Termination was explicitly requested, thus we need to kill the processes.
             self._terminate()
 
 
-    def _terminate(self):
-        self.log.info(f'Terminating worker')
-
-        for process in self._subprocesses:
-            pid = process.pid
-            subprocess.call(f'sudo kill {pid}', shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-        for process in self._subprocesses:
-            process.wait(60)
-
-
 class FuzztructionJob(AflPlusPlusJob):
 
-    def __init__(self, target: Target, run_id: int, timeout_s: int, cores: int, fuzzer: Fuzzer, log_dir: Path, results_dir: Path, no_afl: bool=False):
+    def __init__(self, target: Target, run_id: int, timeout_s: int, cores: int, fuzzer: Fuzzer, log_dir: Path, results_dir: Path, options: JobOptions = JobOptions(), no_afl: bool=False):
         self._no_afl = no_afl
-        super().__init__(target, run_id, timeout_s, cores, fuzzer, log_dir, results_dir)
+        super().__init__(target, run_id, timeout_s, cores, fuzzer, log_dir, results_dir, options)
 
     def _spawn_other_fuzzing_process(self) -> int:
         if self._no_afl:
@@ -367,8 +1386,8 @@ class FuzztructionJob(AflPlusPlusJob):
         ]
         self.log.info(f'FT (no_afl={self._no_afl}) command: {" ".join(ft_cmd)}')
 
-        log_path = self._log_dir / f'{self.fuzzer_workdir().name}-ftworker.log'
-        process = subprocess.Popen(ft_cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT)
+        log_path = self._log_path('ftworker')
+        process = subprocess.Popen(ft_cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT, start_new_session=True)
         self._subprocesses.append(process)
 
         return afl_cores
@@ -392,8 +1411,8 @@ class WeizzJob(AflPlusPlusJob):
         ]
         self.log.info(f'WEIZZ command: {" ".join(weizz_cmd)}')
 
-        log_path = self._log_dir / f'{self.fuzzer_workdir().name}-weizz.log'
-        process = subprocess.Popen(weizz_cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT)
+        log_path = self._log_path('weizz')
+        process = subprocess.Popen(weizz_cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT, start_new_session=True)
         self._subprocesses.append(process)
         time.sleep(5)
 
@@ -429,14 +1448,232 @@ class SymccJob(AflPlusPlusJob):
         ]
         self.log.info(f'SYMCC command: {" ".join(symcc_cmd)}')
 
-        log_path = self._log_dir / f'{self.fuzzer_workdir().name}-symcc.log'
-        process = subprocess.Popen(symcc_cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT)
+        log_path = self._log_path('symcc')
+        process = subprocess.Popen(symcc_cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT, start_new_session=True)
         self._subprocesses.append(process)
         time.sleep(5)
 
         return 0
 
 
+class CoverageAggregator:
+    """
+    Computes the coverage.csv of each run as soon as its traces arrived in the results
+    directory, instead of in a separate batch step after the campaign. Coverage is only
+    computed on cores not allocated to fuzzing jobs, which stay allocated to the computation
+    until it finished, and only for runs whose traces changed since their coverage was
+    computed the last time.
+    """
+
+    # Fingerprint of the traces the run's coverage.csv was computed from.
+    KEY_FILE = 'coverage.key'
+    # Directory inside the results directory used to compute the coverage of a single run.
+    STAGING_DIR = '.coverage-staging'
+
+    def __init__(self, options: CoverageOptions, results_dir: Path, log_dir: Path,
+                 reserve_cores: Callable[[int], int], release_cores: Callable[[int], None],
+                 trace_store: Optional[Path] = None):
+        self._options = options
+        self._results_dir = results_dir
+        self._trace_store = trace_store
+        self._log_dir = log_dir
+        # Allocate the spare cores (if at least the given number) and return them after computing.
+        self._reserve_cores = reserve_cores
+        self._release_cores = release_cores
+        self._queue: Queue = Queue()
+        self._queued: Set[Path] = set()
+        # Runs found in the results directory at startup, whose coverage.csv may stem from the batch coverage step.
+        self._existing: Set[Path] = set()
+        self._lock = Lock()
+        self._stop_requested = False
+        self._process: Optional[subprocess.Popen] = None
+        self._worker: Optional[Thread] = None
+        self.log = logging.LoggerAdapter(logging.getLogger('Coverage'), {'job_name': 'Coverage'})
+
+    def _stored_runs(self) -> Dict[str, str]:
+        """
+        Keys of all runs in the trace store by their name.
+        """
+        if self._trace_store is None or not TraceStore.exists(self._trace_store):
+            return {}
+        store = TraceStore(self._trace_store, readonly=True)
+        try:
+            return {run: store.run_key(run) for run in store.runs()}
+        finally:
+            store.close()
+
+    def traces_key(self, run_dir: Path) -> Optional[str]:
+        """
+        Fingerprint of the traces of `run_dir` based on the names, sizes, and modification
+        times of all files, or the key of the run in the trace store. Returns None if the
+        run has no traces.
+        """
+        traces_dir = run_dir / 'traces'
+        if not traces_dir.is_dir():
+            return self._stored_runs().get(run_dir.name)
+        h = hashlib.sha256()
+        for dirpath, dirnames, filenames in os.walk(traces_dir):
+            dirnames.sort()
+            for name in sorted(filenames):
+                path = Path(dirpath) / name
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                h.update(f'{path.relative_to(traces_dir).as_posix()} {stat.st_size} {stat.st_mtime_ns}\n'.encode(errors='surrogateescape'))
+        return h.hexdigest()
+
+    @staticmethod
+    def is_up_to_date(run_dir: Path, key: str) -> bool:
+        key_file = run_dir / CoverageAggregator.KEY_FILE
+        try:
+            return (run_dir / 'coverage.csv').is_file() and key_file.read_text().strip() == key
+        except OSError:
+            return False
+
+    def _adopt(self, run_dir: Path, key: str) -> bool:
+        """
+        Record `key` for a run found at startup that has a coverage.csv but no key file,
+        i.e., whose coverage was computed by the batch coverage binary. Recomputing it would
+        only take time. Returns whether the run was adopted.
+        """
+        if run_dir not in self._existing:
+            return False
+        if not (run_dir / 'coverage.csv').is_file() or (run_dir / CoverageAggregator.KEY_FILE).exists():
+            return False
+        self.log.info(f'Adopting the existing coverage of {run_dir.name}')
+        subprocess.run(['sudo', 'tee', (run_dir / CoverageAggregator.KEY_FILE).as_posix()], input=f'{key}\n'.encode(),
+                       stdout=subprocess.DEVNULL, check=True)
+        return True
+
+    def submit(self, run_dir: Path):
+        """
+        Queue the computation of the coverage of `run_dir`.
+        """
+        with self._lock:
+            if run_dir in self._queued:
+                return
+            self._queued.add(run_dir)
+        self._queue.put(run_dir)
+
+    def start(self, exclude: Set[str]):
+        """
+        Start the worker and queue all runs in the results directory whose coverage is
+        missing or outdated. Runs that already have a coverage.csv but no key are adopted
+        as they are. Runs named in `exclude` are scheduled by the campaign and thus
+        submitted as soon as their traces were synced.
+        """
+        if self._results_dir.is_dir():
+            stored_runs = self._stored_runs()
+            for run_dir in sorted(self._results_dir.iterdir()):
+                if run_dir.name in exclude or run_dir.name == CoverageAggregator.STAGING_DIR:
+                    continue
+                if (run_dir / 'traces').is_dir() or run_dir.name in stored_runs:
+                    self._existing.add(run_dir)
+                    self.submit(run_dir)
+        self._worker = Thread(target=self._loop, name='coverage', daemon=True)
+        self._worker.start()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._queued)
+
+    def join(self):
+        """
+        Wait until the coverage of all submitted runs was computed.
+        """
+        if self._worker is None:
+            return
+        self.log.info(f'Waiting for the coverage computation of {self.pending()} run(s)')
+        self._queue.put(None)
+        self._worker.join()
+
+    def stop(self):
+        """
+        Stop the worker, even if there are runs left whose coverage was not computed yet.
+        """
+        self._stop_requested = True
+        self._queue.put(None)
+        if self._worker is not None:
+            self._worker.join()
+
+    def _loop(self):
+        while not self._stop_requested:
+            run_dir = self._queue.get()
+            if run_dir is None:
+                break
+            try:
+                key = self.traces_key(run_dir)
+                if key is None or CoverageAggregator.is_up_to_date(run_dir, key) or self._adopt(run_dir, key):
+                    with self._lock:
+                        self._queued.discard(run_dir)
+                    continue
+            except Exception:
+                self.log.warning(f'Failed to check the coverage of {run_dir}', exc_info=True)
+            cores = 0
+            while not self._stop_requested:
+                cores = self._reserve_cores(self._options.min_cores)
+                if cores:
+                    break
+                time.sleep(5)
+            with self._lock:
+                self._queued.discard(run_dir)
+            if self._stop_requested:
+                if cores:
+                    self._release_cores(cores)
+                break
+            try:
+                self._compute(run_dir, cores)
+            except Exception:
+                self.log.warning(f'Failed to compute the coverage of {run_dir}', exc_info=True)
+            finally:
+                self._release_cores(cores)
+
+    def _compute(self, run_dir: Path, cores: int):
+        key = self.traces_key(run_dir)
+        if key is None or CoverageAggregator.is_up_to_date(run_dir, key):
+            return
+
+        start_ts = time.monotonic()
+        self.log.info(f'Computing coverage of {run_dir.name} on {cores} cores')
+        # The coverage binary processes all runs in the directory it is passed, thus a
+        # hard-linked copy of the single run is created on the same filesystem.
+        staging_dir = self._results_dir / CoverageAggregator.STAGING_DIR / run_dir.name
+        staged_run = staging_dir / run_dir.name
+        subprocess.run(['sudo', 'rm', '-rf', staging_dir.as_posix()], check=True)
+        subprocess.run(['sudo', 'mkdir', '-p', staging_dir.as_posix()], check=True)
+        try:
+            subprocess.run(['sudo', 'cp', '-al', run_dir.as_posix(), staging_dir.as_posix()], check=True)
+            subprocess.run(['sudo', 'rm', '-f', (staged_run / 'coverage.csv').as_posix()], check=True)
+            if not (staged_run / 'traces').is_dir():
+                # The coverage binary expects the traces as individual files.
+                subprocess.run(['sudo', sys.executable, TRACE_STORE_SCRIPT.as_posix(), 'extract', self._trace_store.as_posix(),
+                                run_dir.name, (staged_run / 'traces').as_posix()], stdout=subprocess.DEVNULL, check=True)
+
+            cmd = [
+                'sudo', 'env', f'RAYON_NUM_THREADS={cores}',
+                'nice', '-n', '19',
+                self._options.coverage_bin.as_posix(), staging_dir.as_posix(),
+            ]
+            log_path = self._log_dir / f'{run_dir.name}-coverage.log'
+            self._process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=log_path.open('w'), stderr=subprocess.STDOUT, start_new_session=True)
+            while self._process.poll() is None:
+                if self._stop_requested:
+                    kill_process_tree(self._process, self.log, 60)
+                    return
+                time.sleep(1)
+            if self._process.returncode != 0 or not (staged_run / 'coverage.csv').is_file():
+                self.log.warning(f'Computing coverage of {run_dir.name} failed (see {log_path})')
+                return
+
+            subprocess.run(['sudo', 'cp', (staged_run / 'coverage.csv').as_posix(), (run_dir / 'coverage.csv').as_posix()], check=True)
+            subprocess.run(['sudo', 'tee', (run_dir / CoverageAggregator.KEY_FILE).as_posix()], input=f'{key}\n'.encode(),
+                           stdout=subprocess.DEVNULL, check=True)
+            self.log.info(f'Computed coverage of {run_dir.name} in {time.monotonic() - start_ts:.0f}s')
+        finally:
+            self._process = None
+            subprocess.run(['sudo', 'rm', '-rf', staging_dir.as_posix()])
+
 class EvaluationCampaign:
 
     def __init__(
@@ -447,68 +1684,160 @@ class EvaluationCampaign:
         ) -> None:
         self._config = config
         self._allocated_cores = 0
+        # Cores allocated to the coverage computation, which runs in the aggregator's thread.
+        self._coverage_cores = 0
+        self._cores_lock = Lock()
         self._max_cores = config.cores_total
         self._pending_jobs = deque(EvaluationCampaign.generate_jobs(config, log_dir))
         self._running_jobs: List[FuzzingJob] = []
         self._jobs_done: List[FuzzingJob] = []
+        # Failed jobs waiting for their backoff to expire as (due timestamp, retry, failed job).
+        self._pending_retries: List[Tuple[float, FuzzingJob, FuzzingJob]] = []
+        self._coverage: Optional[CoverageAggregator] = None
+        if config.coverage is not None:
+            self._coverage = CoverageAggregator(config.coverage, config.results_path, log_dir,
+                                                self.reserve_spare_cores, self.release_coverage_cores,
+                                                config.trace_store_path())
         self.log = logger
 
 
     @staticmethod
     def generate_jobs(config: CampaignConfig, log_dir: Path) -> List[FuzzingJob]:
-        SYMCC_UNSUPPORTED_TARGETS = ("7zip_7zip", "7zip-enc_7zip-dec", "sign_vfychain")
+        options = config.job_options()
         jobs: List[FuzzingJob] = []
         for id in range(config.first_run_id, config.last_run_id + 1):
             for fuzzer in config.fuzzers:
                 for target in config.targets:
-                    if fuzzer == Fuzzer.FUZZTRUCTION:
-                        j = FuzztructionJob(target, id, config.timeout_s, config.cores_per_target, fuzzer, log_dir, config.results_path)
-                        jobs.append(j)
-                    elif fuzzer == Fuzzer.FUZZTRUCTION_NO_AFL:
-                        j = FuzztructionJob(target, id, config.timeout_s, config.cores_per_target, fuzzer, log_dir, config.results_path, no_afl=True)
-                        jobs.append(j)
-                    elif fuzzer == Fuzzer.AFLPP:
-                        j = AflPlusPlusJob(target, id, config.timeout_s, config.cores_per_target, fuzzer, log_dir, config.results_path)
-                        jobs.append(j)
-                    elif fuzzer == Fuzzer.SYMCC:
-                        if target.name in SYMCC_UNSUPPORTED_TARGETS:
-                            print(f'Skipping unsupported target {target.name} for SYMCC')
-                            continue
-
-                        j = SymccJob(target, id, config.timeout_s, config.cores_per_target, fuzzer, log_dir, config.results_path)
-                        jobs.append(j)
-                    elif fuzzer == Fuzzer.WEIZZ:
-                        j = WeizzJob(target, id, config.timeout_s, config.cores_per_target, fuzzer, log_dir, config.results_path)
-                        jobs.append(j)
-                    else:
-                        assert(False)
+                    if fuzzer == Fuzzer.SYMCC and target.name in SYMCC_UNSUPPORTED_TARGETS:
+                        print(f'Skipping unsupported target {target.name} for SYMCC')
+                        continue
+                    j = EvaluationCampaign.create_job(target, id, config.timeout_s, config.cores_per_target, fuzzer, log_dir, config.results_path, options)
+                    jobs.append(j)
         return jobs
 
+    @staticmethod
+    def create_job(target: Target, run_id: int, timeout_s: int, cores: int, fuzzer: Fuzzer, log_dir: Path, results_dir: Path, options: JobOptions) -> FuzzingJob:
+        if fuzzer == Fuzzer.FUZZTRUCTION:
+            return FuzztructionJob(target, run_id, timeout_s, cores, fuzzer, log_dir, results_dir, options)
+        elif fuzzer == Fuzzer.FUZZTRUCTION_NO_AFL:
+            return FuzztructionJob(target, run_id, timeout_s, cores, fuzzer, log_dir, results_dir, options, no_afl=True)
+        elif fuzzer == Fuzzer.AFLPP:
+            return AflPlusPlusJob(target, run_id, timeout_s, cores, fuzzer, log_dir, results_dir, options)
+        elif fuzzer == Fuzzer.SYMCC:
+            return SymccJob(target, run_id, timeout_s, cores, fuzzer, log_dir, results_dir, options)
+        elif fuzzer == Fuzzer.WEIZZ:
+            return WeizzJob(target, run_id, timeout_s, cores, fuzzer, log_dir, results_dir, options)
+        else:
+            assert(False)
+
+    def schedule_due_retries(self):
+        """
+        Move retries whose backoff expired to the front of the pending jobs. A retry is only
+        scheduled after the worker of the failed attempt exited, since both share the same workdir.
+        """
+        now = time.monotonic()
+        for entry in self._pending_retries.copy():
+            due_ts, retry, failed_job = entry
+            if due_ts <= now and not failed_job.is_alive():
+                self._pending_retries.remove(entry)
+                self._pending_jobs.appendleft(retry)
+
+    def interferes_with_running_jobs(self, job: FuzzingJob) -> bool:
+        """
+        Whether `job` should not be started now, since its target and the target of a running job
+        slow each other down more than allowed by the interference matrix.
+        """
+        matrix = self._config.interference_matrix
+        if matrix is None:
+            return False
+        for running_job in self._running_jobs:
+            if matrix.conflicts(job.target().name, running_job.target().name, self._config.max_slowdown):
+                return True
+        return False
+
     def start_next_job(self):
+        self.schedule_due_retries()
         if len(self._pending_jobs) == 0:
             return
-        if self._allocated_cores >= self._config.cores_total:
+        with self._cores_lock:
+            if self._allocated_cores >= self._config.cores_total:
+                return
+            # The coverage computation only uses cores no job needs, thus a job may not overlap with them.
+            if self._coverage_cores and self.spare_cores() < self._config.cores_per_target:
+                return
+        # Pick the first job that can be co-located with the running ones.
+        next_job: Optional[FuzzingJob] = None
+        for job in self._pending_jobs:
+            if not self.interferes_with_running_jobs(job):
+                next_job = job
+                break
+        if next_job is None:
             return
-        next_job: FuzzingJob = self._pending_jobs.popleft()
+        self._pending_jobs.remove(next_job)
         next_job.start()
         assert next_job.state != JobState.READY
         self._running_jobs.append(next_job)
-        self._allocated_cores += self._config.cores_per_target
-        self.log.info(f'Allocated cores: {self._allocated_cores}')
+        with self._cores_lock:
+            self._allocated_cores += self._config.cores_per_target
+            self.log.info(f'Allocated cores: {self._allocated_cores}')
 
     def check_running_jobs(self):
         for job in self._running_jobs.copy():
+            if job.phase_overdue():
+                self.log.error(f'Job {job} exceeded the expected duration of {job.state()}')
+                job.declare_dead()
             if job.state() in [JobState.FINISHED, JobState.FAILED]:
                 self.log.info(f'Job {job} terminated with state {job.state()}')
                 self._running_jobs.remove(job)
                 self._jobs_done.append(job)
-                self._allocated_cores -= self._config.cores_per_target
-                self.log.info(f'Allocated cores: {self._allocated_cores}')
+                with self._cores_lock:
+                    self._allocated_cores -= self._config.cores_per_target
+                    self.log.info(f'Allocated cores: {self._allocated_cores}')
+                if job.state() == JobState.FAILED:
+                    self.schedule_retry(job)
+                elif self._coverage is not None:
+                    self._coverage.submit(self._config.results_path / job.name())
+
+    def schedule_retry(self, job: FuzzingJob):
+        policy = self._config.retry_policy
+        if job.attempt() >= policy.max_attempts:
+            self.log.error(f'Job {job} failed after {job.attempt()} attempt(s), giving up')
+            return
+        delay_s = policy.delay_s(job.attempt())
+        self.log.info(f'Retrying job {job} in {int(delay_s)}s')
+        self._pending_retries.append((time.monotonic() + delay_s, job.retry(), job))
+
+    def spare_cores(self) -> int:
+        """
+        Number of cores neither allocated to fuzzing jobs nor to the coverage computation.
+        """
+        return self._max_cores - self._allocated_cores - self._coverage_cores
+
+    def reserve_spare_cores(self, min_cores: int) -> int:
+        """
+        Allocate all spare cores to the coverage computation if there are at least `min_cores`.
+        Returns the number of allocated cores (0 if too few are spare), which must be passed to
+        `release_coverage_cores` once the computation finished.
+        """
+        with self._cores_lock:
+            cores = self.spare_cores()
+            if cores < min_cores:
+                return 0
+            self._coverage_cores += cores
+            self.log.info(f'Allocated cores: {self._allocated_cores} (+{self._coverage_cores} for coverage)')
+            return cores
+
+    def release_coverage_cores(self, cores: int):
+        with self._cores_lock:
+            self._coverage_cores -= cores
+            self.log.info(f'Allocated cores: {self._allocated_cores} (+{self._coverage_cores} for coverage)')
 
     def check_if_finished(self):
-        return len(self._pending_jobs) == 0 and len(self._running_jobs) == 0
+        return len(self._pending_jobs) == 0 and len(self._running_jobs) == 0 and len(self._pending_retries) == 0
 
     def start(self):
+        if self._coverage is not None:
+            self._coverage.start(exclude={j.name() for j in self._pending_jobs})
         while True:
             time.sleep(3)
             self.check_running_jobs()
@@ -516,33 +1845,208 @@ class EvaluationCampaign:
             if self.check_if_finished():
                 self.log.info('All jobs finished.')
                 break
+        if self._coverage is not None:
+            self._coverage.join()
 
     def stop_and_join(self):
+        if self._coverage is not None:
+            self._coverage.stop()
         for j in self._running_jobs:
             j.request_exit()
         for j in self._running_jobs:
             j.join()
 
-def setup_logger(log_dir: Path) -> logging.Logger:
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.DEBUG)
+class _DeferredFlushMixin:
+    """
+    Makes a `StreamHandler` leave flushing to the `LogWriter`, which flushes in batches.
+    """
+
+    def flush(self):
+        pass
+
+    def flush_now(self):
+        super().flush()
+
+class _DeferredFlushStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    pass
+
+class _DeferredFlushFileHandler(_DeferredFlushMixin, logging.FileHandler):
+    pass
+
+class _DefaultJobNameFilter(logging.Filter):
+    """
+    Attach the job_name 'Main' to records that are not logged via a job's LoggerAdapter.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'job_name'):
+            record.job_name = 'Main'
+        return True
+
+class LogWriter:
+    """
+    Performs all formatting and I/O of log records on a single thread.
+    The scheduler and job threads only enqueue their records, thus logging never
+    blocks them. Records are written to stderr, main.log, and, if it was registered via
+    `open_job_log`, the log file of the job that emitted it.
+    """
+
+    # Flush all handlers at the latest after this many seconds.
+    FLUSH_INTERVAL_S = 1.0
+    # Flush all handlers at the latest after this many records.
+    FLUSH_BATCH_SIZE = 256
+
+    def __init__(self, main_log_path: Path, formatter: logging.Formatter):
+        self._queue: Queue = Queue()
+        self._formatter = formatter
+        self._handlers: List[_DeferredFlushMixin] = [
+            _DeferredFlushStreamHandler(),
+            _DeferredFlushFileHandler(main_log_path),
+        ]
+        for handler in self._handlers:
+            handler.setFormatter(formatter)
+        self._job_handlers: Dict[str, _DeferredFlushFileHandler] = {}
+        self._unflushed = 0
+        self._last_flush_ts = time.monotonic()
+        self._thread = Thread(target=self._loop, name='LogWriter', daemon=True)
 
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('[%(asctime)s][%(job_name)s][%(levelname)s][%(filename)s:%(lineno)d][%(funcName)s()]: %(message)s')
-    handler.setFormatter(formatter)
-    root_logger.addHandler(handler)
+    def start(self):
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Write all pending records, close all files, and join the writer thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def flush(self):
+        """
+        Wait until all records enqueued so far have been written.
+        """
+        if self._thread.is_alive():
+            done = Event()
+            self._queue.put(done)
+            done.wait()
+
+    def queue_handler(self) -> logging.Handler:
+        """
+        Handler that needs to be attached to loggers whose records should be written by this writer.
+        """
+        handler = logging.handlers.QueueHandler(self._queue)
+        handler.addFilter(_DefaultJobNameFilter())
+        return handler
+
+    def open_job_log(self, job_name: str, path: Path):
+        """
+        Additionally write all records of `job_name` to `path`. The file is opened on the first record.
+        """
+        self._queue.put(('open', job_name, path))
+
+    def close_job_log(self, job_name: str):
+        """
+        Close the log file of `job_name` after all records enqueued so far have been written.
+        """
+        self._queue.put(('close', job_name, None))
+
+    def _flush(self):
+        for handler in self._handlers:
+            handler.flush_now()
+        for handler in self._job_handlers.values():
+            handler.flush_now()
+        self._unflushed = 0
+        self._last_flush_ts = time.monotonic()
+
+    def _handle_command(self, command: str, job_name: str, path: Optional[Path]):
+        if command == 'open':
+            handler = _DeferredFlushFileHandler(path, delay=True)
+            handler.setFormatter(self._formatter)
+            old_handler = self._job_handlers.pop(job_name, None)
+            if old_handler is not None:
+                old_handler.close()
+            self._job_handlers[job_name] = handler
+        elif command == 'close':
+            handler = self._job_handlers.pop(job_name, None)
+            if handler is not None:
+                handler.close()
+        else:
+            assert False, f'Unknown command {command}'
+
+    def _handle_record(self, record: logging.LogRecord):
+        for handler in self._handlers:
+            handler.handle(record)
+        job_handler = self._job_handlers.get(record.job_name)
+        if job_handler is not None:
+            job_handler.handle(record)
+        self._unflushed += 1
+        if record.levelno >= logging.WARNING:
+            # Make sure problems show up immediately.
+            self._flush()
+
+    def _loop(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.FLUSH_INTERVAL_S)
+            except Empty:
+                if self._unflushed:
+                    self._flush()
+                continue
+
+            if item is None:
+                break
+            try:
+                if isinstance(item, logging.LogRecord):
+                    self._handle_record(item)
+                elif isinstance(item, Event):
+                    try:
+                        self._flush()
+                    finally:
+                        item.set()
+                else:
+                    self._handle_command(*item)
+            except Exception:
+                # There is no one left to report this to.
+                pass
+
+            if self._unflushed >= self.FLUSH_BATCH_SIZE or time.monotonic() - self._last_flush_ts >= self.FLUSH_INTERVAL_S:
+                self._flush()
+
+        self._flush()
+        for handler in list(self._job_handlers.values()) + self._handlers:
+            handler.close()
+        self._job_handlers.clear()
+
+# Writer of all log records. Set by `setup_logger`.
+_log_writer: Optional[LogWriter] = None
+
+def setup_logger(log_dir: Path) -> logging.LoggerAdapter:
+    global _log_writer
 
     shutil.rmtree(log_dir, ignore_errors=True)
     log_dir.mkdir(parents=True)
 
-    log_path = log_dir / 'main.log'
-    logger = logging.getLogger()
-    file_handler = logging.FileHandler(log_path)
-    logger.addHandler(file_handler)
-    return logging.LoggerAdapter(logger, {'job_name': 'Main'})
+    formatter = logging.Formatter('[%(asctime)s][%(job_name)s][%(levelname)s][%(filename)s:%(lineno)d][%(funcName)s()]: %(message)s')
+    _log_writer = LogWriter(log_dir / 'main.log', formatter)
+    _log_writer.start()
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG)
+    root_logger.addHandler(_log_writer.queue_handler())
+    return logging.LoggerAdapter(root_logger, {'job_name': 'Main'})
+
+def shutdown_logger():
+    """
+    Write all pending log records and stop the writer set up by `setup_logger`.
+    """
+    if _log_writer is not None:
+        _log_writer.stop()
 
 def check_env(log: logging.LoggerAdapter):
     def yes_or_terminate():
+        # The warning explaining the question is written by the log writer thread.
+        _log_writer.flush()
         answer = input('Continue anyway? [y/n]: ')
         if answer.lower() == 'n':
             exit(1)
@@ -591,19 +2095,33 @@ def check_env(log: logging.LoggerAdapter):
     subprocess.check_call(cmd, shell=True)
 
 
-log_dir = Path('logs')
-logger = setup_logger(log_dir)
-check_env(logger)
-
-cfg = CampaignConfig.from_path('campaign.yml')
-eval_campaign = EvaluationCampaign(cfg, logger, log_dir)
-
-try:
-    eval_campaign.start()
-except KeyboardInterrupt:
-    logger.info('Got keyboard interrupt, stopping campaign.')
-    eval_campaign.stop_and_join()
-except:
-    logger.error('Unexpected error.', exc_info=True)
-
-logger.info('Exiting')
+def main():
+    log_dir = Path('logs')
+    logger = setup_logger(log_dir)
+    check_env(logger)
+
+    cfg = CampaignConfig.from_path('campaign.yml')
+    try:
+        Preflight(cfg, logger).run()
+        if cfg.corpus is not None:
+            cfg = CorpusStage(cfg, log_dir, logger).run()
+    except (PreflightError, CorpusError) as e:
+        logger.error(str(e))
+        shutdown_logger()
+        exit(1)
+    eval_campaign = EvaluationCampaign(cfg, logger, log_dir)
+
+    try:
+        eval_campaign.start()
+    except KeyboardInterrupt:
+        logger.info('Got keyboard interrupt, stopping campaign.')
+        eval_campaign.stop_and_join()
+    except:
+        logger.error('Unexpected error.', exc_info=True)
+
+    logger.info('Exiting')
+    shutdown_logger()
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,7 @@ Plot coverage data. This creates Figure 3 in the paper (as file all_coverage.pdf
 # sudo apt install texlive texlive-latex-extra texlive-fonts-recommended dvipng cm-super
 """
 import matplotlib.pyplot as plt
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from collections import defaultdict
 from matplotlib.pyplot import Figure, Axes
 from pathlib import Path
@@ -114,6 +114,8 @@ class PlotData(object):
     raw_bbs: List[List[int]]
     medians: List[float]
     intervals: List[Tuple[int, int]]
+    # seconds fuzzed by each run the adaptive budget stopped early
+    run_lengths: List[int] = field(default_factory=list)
 
 
 def parse(path: Path) -> List[Tuple[int, int]]:
@@ -138,6 +140,19 @@ def parse(path: Path) -> List[Tuple[int, int]]:
     return res
 
 
+def parse_run_info(path: Path) -> Tuple[int, bool]:
+    """
+    Parse a run_info.csv file and return the number of seconds the run fuzzed and
+    whether it was stopped early by the adaptive budget.
+    """
+    with open(path, "r", encoding="utf8") as f:
+        content = [l.strip() for l in f.readlines() if l.strip()]
+    assert len(content) == 2, \
+        f"Expected 2 lines, found {len(content)} in {path.as_posix()}"
+    fuzzing_s, _budget_s, stopped_early = content[1].split(";")
+    return int(fuzzing_s), stopped_early == "1"
+
+
 def plot(data: Dict[str, PlotData], target: str, ax: Axes) -> None:
     """
     Plots data as a line (i.e., one fuzzer for one target)
@@ -166,6 +181,12 @@ def plot(data: Dict[str, PlotData], target: str, ax: Axes) -> None:
             )
         else:
             print(f"{target}:{name}: No ci data")
+        # mark where runs stopped early because of the adaptive budget
+        if fuzzer_data.run_lengths:
+            ax.axvline(
+                median(fuzzer_data.run_lengths), color=FUZZERS[name]["color"],
+                linestyle="dotted"
+            )
 
     ax.set_ylim(ymin=0)
     # remove top & right line
@@ -176,7 +197,8 @@ def plot(data: Dict[str, PlotData], target: str, ax: Axes) -> None:
 
 
 def plot_target_median(raw_data: Dict[str, List[List[Tuple[int, int]]]],
-                        target: str, ax: Axes) -> Figure:
+                        target: str, ax: Axes,
+                        run_lengths: Dict[str, List[int]] = {}) -> Figure:
     """
     Given raw data for a single target, plot each fuzzer for this target 
     """
@@ -216,7 +238,8 @@ def plot_target_median(raw_data: Dict[str, List[List[Tuple[int, int]]]],
             seconds=[s for s in seconds if s % 60 == 0],
             raw_bbs=all_raw_bbs,
             medians=medians,
-            intervals=intervals
+            intervals=intervals,
+            run_lengths=run_lengths.get(fuzzer, [])
         )
     return plot(fuzzer_data, target=target, ax=ax)
 
@@ -256,6 +279,28 @@ def extract_data(base_dir: Path, target: str, fuzzer_names: List[str],
     return all_data
 
 
+def extract_run_lengths(base_dir: Path, target: str, fuzzer_names: List[str],
+            num_runs: int) -> Dict[str, List[int]]:
+    """
+    extract the actual length of runs that were stopped early by the adaptive budget,
+    as recorded in their run_info.csv (runs that ended early for other reasons, e.g.,
+    crashes or the watchdog, are not counted)
+    """
+    all_lengths: Dict[str, List[int]] = {}
+    for fuzzer in fuzzer_names:
+        lengths = []
+        for i in range(1, num_runs+1):
+            run_info = base_dir / f"{target}-{fuzzer}-{runtime}s-{i}" / "run_info.csv"
+            if run_info.exists():
+                fuzzing_s, stopped_early = parse_run_info(run_info)
+                if stopped_early:
+                    lengths.append(fuzzing_s)
+        if lengths:
+            print(f"{target}:{fuzzer}: runs stopped early after {lengths} seconds")
+            all_lengths[fuzzer] = lengths
+    return all_lengths
+
+
 def plot_all_targets() -> None:
     """
     Plot medians of all fuzzers for all targets
@@ -288,12 +333,12 @@ def plot_all_targets() -> None:
     # read data for each target
     for target in sorted(list(targets)):
         print(f"{target}: Processing..")
-        plot_data = extract_data(
-            done_runs_dir, target, ["Fuzztruction", "Fuzztruction-No-AFL", "AFL++", "SYMCC", "WEIZZ"], NUM_RUNS
-        )
+        fuzzer_names = ["Fuzztruction", "Fuzztruction-No-AFL", "AFL++", "SYMCC", "WEIZZ"]
+        plot_data = extract_data(done_runs_dir, target, fuzzer_names, NUM_RUNS)
+        run_lengths = extract_run_lengths(done_runs_dir, target, fuzzer_names, NUM_RUNS)
 
         col, row = TARGETS_TO_POSITION[target]
-        plot_target_median(plot_data, target=target, ax=axes[row][col])
+        plot_target_median(plot_data, target=target, ax=axes[row][col], run_lengths=run_lengths)
         print()
 
     fig.supxlabel("Time [h]", fontsize="large")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Summarize the fuzzer throughput recorded by eval.py (fuzzer_stats.csv of each run) and,
+if a second results directory is given, compare it against the first one. This allows
+spotting throughput regressions between campaigns (e.g., after rebuilding the targets).
+
+Usage: ./throughput.py <baseline-results-dir> [<results-dir>] [--threshold 0.1]
+"""
+import argparse
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import mean, median
+from typing import Dict, List, Optional
+
+# Run directories are named <target>-<fuzzer>-<timeout>s-<run id>.
+RUN_DIR_PATTERN = re.compile(r"^(?P<config>.+-\d+s)-(?P<run_id>\d+)$")
+
+
+@dataclass
+class RunThroughput:
+    # mean executions per second while fuzzing (None if no AFL-style worker reported it, e.g., Fuzztruction-No-AFL)
+    execs_per_sec: Optional[float]
+    # queue size at the end of the run
+    queue_size: int
+    # mean stability in percent (None if not reported)
+    stability: Optional[float]
+    # timeouts at the end of the run
+    timeouts: int
+
+
+def parse(path: Path) -> Optional[RunThroughput]:
+    with open(path, "r", encoding="utf8") as f:
+        content = [l.strip() for l in f.readlines() if l.strip()]
+    # skip column header
+    rows = [l.split(";") for l in content[1:]]
+    if not rows:
+        return None
+    # samples without workers (taken before they wrote their first stats, or of fuzzers
+    # without AFL-style workers) only provide the queue size
+    worker_rows = [r for r in rows if int(r[6]) > 0]
+    stabilities = [float(r[3]) for r in worker_rows if r[3]]
+    return RunThroughput(
+        execs_per_sec=mean(float(r[1]) for r in worker_rows) if worker_rows else None,
+        queue_size=int(rows[-1][2]),
+        stability=mean(stabilities) if stabilities else None,
+        timeouts=int(rows[-1][4]),
+    )
+
+
+def collect(results_dir: Path) -> Dict[str, List[RunThroughput]]:
+    """
+    Throughput of all runs in `results_dir`, grouped by <target>-<fuzzer>-<timeout>s.
+    """
+    ret: Dict[str, List[RunThroughput]] = {}
+    for stats_file in sorted(results_dir.glob("*/fuzzer_stats.csv")):
+        match = RUN_DIR_PATTERN.match(stats_file.parent.name)
+        if match is None:
+            continue
+        run = parse(stats_file)
+        if run is None:
+            print(f"[!] {stats_file.as_posix()} contains no samples")
+            continue
+        ret.setdefault(match.group("config"), []).append(run)
+    return ret
+
+
+def summarize(runs: List[RunThroughput]) -> RunThroughput:
+    """
+    Median over all runs of a configuration.
+    """
+    stabilities = [r.stability for r in runs if r.stability is not None]
+    execs_per_sec = [r.execs_per_sec for r in runs if r.execs_per_sec is not None]
+    return RunThroughput(
+        execs_per_sec=median(execs_per_sec) if execs_per_sec else None,
+        queue_size=int(median(r.queue_size for r in runs)),
+        stability=median(stabilities) if stabilities else None,
+        timeouts=int(median(r.timeouts for r in runs)),
+    )
+
+
+def format_row(config: str, num_runs: int, t: RunThroughput) -> str:
+    stability = f"{t.stability:.1f}%" if t.stability is not None else "-"
+    execs_per_sec = f"{t.execs_per_sec:.1f}" if t.execs_per_sec is not None else "-"
+    return f"{config:<50} {num_runs:>4} {execs_per_sec:>12} {t.queue_size:>8} {stability:>9} {t.timeouts:>9}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize and compare the throughput of campaigns.")
+    parser.add_argument("baseline", type=Path, help="Results directory of the (baseline) campaign.")
+    parser.add_argument("other", type=Path, nargs="?", help="Results directory of a campaign to compare against the baseline.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative exec/s drop reported as regression (default: 0.1).")
+    args = parser.parse_args()
+
+    baseline = collect(args.baseline)
+    if args.other is None:
+        print(f"{'configuration':<50} {'runs':>4} {'exec/s':>12} {'queue':>8} {'stability':>9} {'timeouts':>9}")
+        for config, runs in sorted(baseline.items()):
+            print(format_row(config, len(runs), summarize(runs)))
+        return
+
+    other = collect(args.other)
+    regressions = 0
+    print(f"{'configuration':<50} {'exec/s (base)':>14} {'exec/s':>12} {'change':>8}")
+    for config in sorted(set(baseline) | set(other)):
+        if config not in baseline or config not in other:
+            print(f"{config:<50} [!] only in {'baseline' if config in baseline else 'other'}")
+            continue
+        base = summarize(baseline[config]).execs_per_sec
+        cur = summarize(other[config]).execs_per_sec
+        if base is None or cur is None:
+            print(f"{config:<50} [!] exec/s not measured")
+            continue
+        change = (cur - base) / base if base > 0 else 0.0
+        marker = ""
+        if change < -args.threshold:
+            marker = " [!] regression"
+            regressions += 1
+        print(f"{config:<50} {base:>14.1f} {cur:>12.1f} {change:>+8.1%}{marker}")
+    print(f"\n{regressions} configuration(s) lost more than {args.threshold:.0%} exec/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Content-deduplicated store for the coverage traces of all runs of a campaign.
+
+Instead of keeping each trace as individual file below `<run>/traces/`, the payloads are
+compressed and appended to a few large pack files. Identical payloads (within a run and
+across runs) are stored only once. An SQLite index maps each (run, path) to its payload,
+such that single traces can be read with one lookup and one read.
+
+Layout of a store:
+    index.sqlite        Index of runs, traces, and payloads.
+    pack-000001.bin     Append-only files containing the zlib-compressed payloads.
+    lock                Serializes writers (e.g., jobs syncing concurrently).
+
+Usage:
+    ./trace_store.py add <store> <run> <traces-dir>
+    ./trace_store.py import <store> <results-dir> [--delete-source]
+    ./trace_store.py merge <store> <other-store>
+    ./trace_store.py extract <store> <run> <dest>
+    ./trace_store.py ls <store> [run]
+    ./trace_store.py stats <store>
+"""
+
+import argparse
+import fcntl
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# Name of the store inside the results directory.
+TRACE_STORE_DIR = 'trace-store'
+
+INDEX_FILE = 'index.sqlite'
+LOCK_FILE = 'lock'
+# A new pack file is started once the current one exceeds this size.
+MAX_PACK_SIZE = 1024 * 1024 * 1024
+COMPRESSION_LEVEL = 6
+# Number of files read (and, if new to the store, compressed) at once while adding a run. Bounds the memory usage.
+CHUNK_SIZE = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    pack INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    name TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    traces INTEGER NOT NULL,
+    added_ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS traces (
+    run TEXT NOT NULL,
+    path TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    mode INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (run, path)
+);
+"""
+
+
+@dataclass
+class StoreStats:
+    runs: int
+    traces: int
+    # Number of distinct payloads.
+    blobs: int
+    # Size of all traces if they were stored as individual files.
+    raw_bytes: int
+    # Size of the distinct payloads after compression.
+    stored_bytes: int
+
+    def __str__(self) -> str:
+        ratio = self.raw_bytes / self.stored_bytes if self.stored_bytes else 0.0
+        return (f'{self.runs} runs, {self.traces} traces, {self.blobs} distinct payloads, '
+                f'{self.raw_bytes / 2**20:.1f} MiB raw, {self.stored_bytes / 2**20:.1f} MiB stored ({ratio:.1f}x)')
+
+
+def _read_trace(path: Path) -> Tuple[str, bytes, os.stat_result]:
+    """
+    Returns the digest and the content of the trace at `path`, and its stat result.
+    """
+    data = path.read_bytes()
+    return hashlib.sha256(data).hexdigest(), data, path.stat()
+
+
+def _compress(data: bytes) -> bytes:
+    return zlib.compress(data, COMPRESSION_LEVEL)
+
+
+class TraceStore:
+    """
+    Reads and writes the traces of a store located at `root`.
+    """
+
+    def __init__(self, root: Path, jobs: Optional[int] = None, readonly: bool = False):
+        # Resolved, since the index of readonly stores is opened via a file URI.
+        self._root = Path(root).resolve()
+        self._jobs = jobs or os.cpu_count() or 1
+        if readonly:
+            # Allows reading stores written by another user (e.g., root via eval.py).
+            self._db = sqlite3.connect(f'{(self._root / INDEX_FILE).as_uri()}?mode=ro', uri=True, timeout=600, check_same_thread=False)
+        else:
+            self._root.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self._root / INDEX_FILE, timeout=600, check_same_thread=False)
+            self._db.executescript(SCHEMA)
+        self._packs: Dict[int, object] = {}
+
+    @staticmethod
+    def exists(root: Path) -> bool:
+        return (root / INDEX_FILE).is_file()
+
+    def close(self):
+        for f in self._packs.values():
+            f.close()
+        self._packs.clear()
+        self._db.close()
+
+    def _pack_path(self, pack: int) -> Path:
+        return self._root / f'pack-{pack:06d}.bin'
+
+    def _pack(self, pack: int):
+        if pack not in self._packs:
+            self._packs[pack] = self._pack_path(pack).open('rb')
+        return self._packs[pack]
+
+    @contextmanager
+    def _write_lock(self):
+        with (self._root / LOCK_FILE).open('a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _current_pack(self) -> int:
+        row = self._db.execute('SELECT MAX(pack) FROM blobs').fetchone()
+        pack = row[0] or 1
+        path = self._pack_path(pack)
+        if path.exists() and path.stat().st_size >= MAX_PACK_SIZE:
+            pack += 1
+        return pack
+
+    def _has_blob(self, digest: str) -> bool:
+        return self._db.execute('SELECT 1 FROM blobs WHERE hash = ?', (digest,)).fetchone() is not None
+
+    def _add(self, run: str, entries: Iterator[Tuple[str, str, Callable[[], bytes], int, int, int]]) -> Tuple[int, int]:
+        """
+        Replace the traces of `run` by `entries`, given as (path, digest, compressed payload,
+        size, mode, mtime_ns). The compressed payload is only obtained if it is new to the store.
+        Must be called while holding the write lock.
+        """
+        pack = self._current_pack()
+        pack_file = self._pack_path(pack).open('ab')
+        new_blobs = 0
+        rows = []
+        pending: Dict[str, Tuple[int, int, int, int]] = {}
+        try:
+            for path, digest, compressed, size, mode, mtime_ns in entries:
+                rows.append((run, path, digest, mode, mtime_ns))
+                if digest in pending:
+                    continue
+                if self._has_blob(digest):
+                    continue
+                if pack_file.tell() >= MAX_PACK_SIZE:
+                    pack_file.flush()
+                    os.fsync(pack_file.fileno())
+                    pack_file.close()
+                    pack += 1
+                    pack_file = self._pack_path(pack).open('ab')
+                data = compressed()
+                offset = pack_file.tell()
+                pack_file.write(data)
+                pending[digest] = (pack, offset, len(data), size)
+                new_blobs += 1
+            pack_file.flush()
+            os.fsync(pack_file.fileno())
+        finally:
+            pack_file.close()
+
+        # Payloads appended by an interrupted add are never referenced and thus ignored.
+        key = hashlib.sha256('\n'.join(f'{r[1]} {r[2]}' for r in rows).encode(errors='surrogateescape')).hexdigest()
+        with self._db:
+            self._db.executemany('INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?, ?)',
+                                 [(h, *location) for h, location in pending.items()])
+            self._db.execute('DELETE FROM traces WHERE run = ?', (run,))
+            self._db.executemany('INSERT INTO traces VALUES (?, ?, ?, ?, ?)', rows)
+            self._db.execute('INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)', (run, key, len(rows), time.time()))
+        return len(rows), new_blobs
+
+    def add_run(self, run: str, traces_dir: Path) -> Tuple[int, int]:
+        """
+        Add all files below `traces_dir` as traces of `run`, replacing the traces the run had
+        before. Returns the number of traces and the number of payloads that were new to the store.
+        """
+        files = sorted(p for p in traces_dir.rglob('*') if p.is_file())
+
+        def entries(executor: ThreadPoolExecutor):
+            # Files are read and hashed in parallel, afterwards only payloads new to the store
+            # are compressed (again in parallel). Traces are appended in order.
+            seen: Set[str] = set()
+            for chunk_start in range(0, len(files), CHUNK_SIZE):
+                chunk = files[chunk_start:chunk_start + CHUNK_SIZE]
+                traces = list(executor.map(_read_trace, chunk))
+                new: Dict[str, bytes] = {}
+                for digest, data, _ in traces:
+                    if digest not in seen and not self._has_blob(digest):
+                        new[digest] = data
+                    seen.add(digest)
+                compressed = dict(zip(new, executor.map(_compress, new.values())))
+                for path, (digest, data, stat) in zip(chunk, traces):
+                    yield (path.relative_to(traces_dir).as_posix(), digest, lambda d=digest: compressed[d], len(data),
+                           stat.st_mode & 0o7777, stat.st_mtime_ns)
+
+        with self._write_lock(), ThreadPoolExecutor(max_workers=self._jobs) as executor:
+            return self._add(run, entries(executor))
+
+    def merge(self, other: 'TraceStore') -> Dict[str, Tuple[int, int]]:
+        """
+        Add all runs of `other` (e.g., the store of another machine), replacing runs with the
+        same name. Compressed payloads are copied as they are. Returns the result of each added run.
+        """
+        ret = {}
+        with self._write_lock():
+            for run in other.runs():
+                rows = other._db.execute(
+                    'SELECT t.path, t.hash, b.pack, b.offset, b.length, b.size, t.mode, t.mtime_ns '
+                    'FROM traces t JOIN blobs b ON t.hash = b.hash WHERE t.run = ? ORDER BY b.pack, b.offset', (run,))
+                entries = ((path, digest, lambda p=pack, o=offset, l=length: other._read_raw(p, o, l), size, mode, mtime_ns)
+                           for path, digest, pack, offset, length, size, mode, mtime_ns in rows)
+                ret[run] = self._add(run, entries)
+        return ret
+
+    def runs(self) -> List[str]:
+        return [r[0] for r in self._db.execute('SELECT name FROM runs ORDER BY name')]
+
+    def run_key(self, run: str) -> Optional[str]:
+        """
+        Digest over the paths and payloads of all traces of `run`, or None if the run is unknown.
+        """
+        row = self._db.execute('SELECT key FROM runs WHERE name = ?', (run,)).fetchone()
+        return row[0] if row else None
+
+    def list(self, run: str) -> List[str]:
+        return [r[0] for r in self._db.execute('SELECT path FROM traces WHERE run = ? ORDER BY path', (run,))]
+
+    def _read_raw(self, pack: int, offset: int, length: int) -> bytes:
+        f = self._pack(pack)
+        f.seek(offset)
+        return f.read(length)
+
+    def _read_blob(self, pack: int, offset: int, length: int) -> bytes:
+        return zlib.decompress(self._read_raw(pack, offset, length))
+
+    def read(self, run: str, path: str) -> bytes:
+        """
+        Return the content of a single trace. Raises KeyError if the trace does not exist.
+        """
+        row = self._db.execute(
+            'SELECT b.pack, b.offset, b.length FROM traces t JOIN blobs b ON t.hash = b.hash '
+            'WHERE t.run = ? AND t.path = ?', (run, path)).fetchone()
+        if row is None:
+            raise KeyError(f'{run}/{path}')
+        return self._read_blob(*row)
+
+    def iter_traces(self, run: str) -> Iterator[Tuple[str, bytes]]:
+        """
+        Yield (path, content) of all traces of `run`. The traces are read in the order
+        they are stored in, such that the pack files are read sequentially.
+        """
+        rows = self._db.execute(
+            'SELECT t.path, b.pack, b.offset, b.length FROM traces t JOIN blobs b ON t.hash = b.hash '
+            'WHERE t.run = ? ORDER BY b.pack, b.offset', (run,)).fetchall()
+        for path, pack, offset, length in rows:
+            yield path, self._read_blob(pack, offset, length)
+
+    def extract(self, run: str, dest: Path) -> int:
+        """
+        Write the traces of `run` as individual files below `dest`. Returns the number of traces.
+        """
+        modes = {path: (mode, mtime_ns) for path, mode, mtime_ns in
+                 self._db.execute('SELECT path, mode, mtime_ns FROM traces WHERE run = ?', (run,))}
+        count = 0
+        for path, data in self.iter_traces(run):
+            target = dest / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+            mode, mtime_ns = modes[path]
+            os.chmod(target, mode)
+            os.utime(target, ns=(mtime_ns, mtime_ns))
+            count += 1
+        return count
+
+    def stats(self) -> StoreStats:
+        runs = self._db.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+        traces, raw_bytes = self._db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(b.size), 0) FROM traces t JOIN blobs b ON t.hash = b.hash').fetchone()
+        blobs, stored_bytes = self._db.execute('SELECT COUNT(*), COALESCE(SUM(length), 0) FROM blobs').fetchone()
+        return StoreStats(runs=runs, traces=traces, blobs=blobs, raw_bytes=raw_bytes, stored_bytes=stored_bytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage a deduplicated store of coverage traces.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add = subparsers.add_parser('add', help='Add (or replace) the traces of a run.')
+    add.add_argument('store', type=Path)
+    add.add_argument('run')
+    add.add_argument('traces_dir', type=Path)
+
+    import_ = subparsers.add_parser('import', help='Add the traces/ directories of all runs in a results directory.')
+    import_.add_argument('store', type=Path)
+    import_.add_argument('results_dir', type=Path)
+    import_.add_argument('--delete-source', action='store_true', help='Delete each traces/ directory after it was added.')
+
+    merge = subparsers.add_parser('merge', help='Add all runs of another store (e.g., of another machine).')
+    merge.add_argument('store', type=Path)
+    merge.add_argument('other', type=Path)
+
+    extract = subparsers.add_parser('extract', help='Write the traces of a run as individual files.')
+    extract.add_argument('store', type=Path)
+    extract.add_argument('run')
+    extract.add_argument('dest', type=Path)
+
+    ls = subparsers.add_parser('ls', help='List all runs or the traces of a run.')
+    ls.add_argument('store', type=Path)
+    ls.add_argument('run', nargs='?')
+
+    stats = subparsers.add_parser('stats', help='Print the size of the store.')
+    stats.add_argument('store', type=Path)
+
+    args = parser.parse_args()
+    if args.command not in ('add', 'import', 'merge') and not TraceStore.exists(args.store):
+        parser.error(f'No trace store found at {args.store}')
+    if args.command == 'merge' and not TraceStore.exists(args.other):
+        parser.error(f'No trace store found at {args.other}')
+
+    store = TraceStore(args.store, readonly=args.command in ('extract', 'ls', 'stats'))
+    try:
+        if args.command == 'add':
+            if not args.traces_dir.is_dir():
+                parser.error(f'{args.traces_dir} is not a directory')
+            traces, new_blobs = store.add_run(args.run, args.traces_dir)
+            print(f'{args.run}: added {traces} traces ({new_blobs} new payloads)')
+        elif args.command == 'import':
+            for run_dir in sorted(args.results_dir.iterdir()):
+                traces_dir = run_dir / 'traces'
+                if not traces_dir.is_dir():
+                    continue
+                traces, new_blobs = store.add_run(run_dir.name, traces_dir)
+                print(f'{run_dir.name}: added {traces} traces ({new_blobs} new payloads)')
+                if args.delete_source:
+                    shutil.rmtree(traces_dir)
+            print(store.stats())
+        elif args.command == 'merge':
+            other = TraceStore(args.other, readonly=True)
+            try:
+                for run, (traces, new_blobs) in store.merge(other).items():
+                    print(f'{run}: added {traces} traces ({new_blobs} new payloads)')
+            finally:
+                other.close()
+            print(store.stats())
+        elif args.command == 'extract':
+            if store.run_key(args.run) is None:
+                parser.error(f'Unknown run {args.run}')
+            print(f'{args.run}: extracted {store.extract(args.run, args.dest)} traces')
+        elif args.command == 'ls':
+            for name in (store.list(args.run) if args.run else store.runs()):
+                print(name)
+        elif args.command == 'stats':
+            print(store.stats())
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()